@@ -1,8 +1,22 @@
+import json
+import time
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
 from fastapi import APIRouter, Request, HTTPException
-from celery import states
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from celery import group, states
 
-from app.tasks.profile_tasks import fetch_itr_profile_task
-from app.core.celery_app import celery_app
+from app.tasks.profile_tasks import fetch_itr_profile_task, fetch_itr_profiles_batch_task
+from app.core import async_celery
+from app.core.config import settings
+from app.services import batch_tracker, profile_cache, single_flight, status_stream, task_status
+from app.services.profile_store import ProfileStore, open_profile_store
+from app.services.selector_stats import selector_metrics
+from app.utils.helpers import password_check, password_matches
 
 router = APIRouter(tags=["ITR Profile Automation"])
 
@@ -10,6 +24,9 @@ router = APIRouter(tags=["ITR Profile Automation"])
 async def process_itr_profile(request: Request):
     """
     Trigger Celery background task to fetch ITR profile details.
+    With "max_age_seconds", a stored profile at most that old is returned
+    immediately instead; with "stale_while_revalidate" an older one is
+    returned too while a refresh is queued.
     """
     try:
         body = await request.json()
@@ -19,39 +36,313 @@ async def process_itr_profile(request: Request):
         if not user_id or not password:
             raise HTTPException(status_code=400, detail="Missing userId or password")
 
-        # Queue task to Celery
-        task = fetch_itr_profile_task.delay(user_id, password)
+        max_age = body.get("max_age_seconds")
+        if max_age is not None:
+            if isinstance(max_age, bool) or not isinstance(max_age, (int, float)) or max_age < 0:
+                raise HTTPException(status_code=400, detail="max_age_seconds must be a non-negative number")
+            cached = await profile_cache.load(user_id, password)
+            if cached:
+                age = max(0.0, time.time() - cached["fetched_at"])
+                if age <= max_age:
+                    return _cached_response(cached, age, fresh=True)
+                if body.get("stale_while_revalidate"):
+                    task_id, _ = await _enqueue_fetch(user_id, password)
+                    return {**_cached_response(cached, age, fresh=False), "task_id": task_id}
 
+        task_id, joined = await _enqueue_fetch(user_id, password)
+        if joined:
+            return {
+                "status": "in_progress",
+                "task_id": task_id,
+                "message": f"ITR profile automation already running for {user_id}."
+            }
         return {
             "status": "queued",
-            "task_id": task.id,
+            "task_id": task_id,
             "message": f"ITR profile automation started for {user_id}."
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/status/{task_id}")
-async def get_task_status(task_id: str):
+def _cached_response(cached: Dict[str, Any], age: float, fresh: bool) -> Dict[str, Any]:
+    return {
+        "status": "cached",
+        "fresh": fresh,
+        "task_id": None,
+        "fetched_at": datetime.fromtimestamp(cached["fetched_at"], timezone.utc).isoformat(),
+        "age_seconds": round(age),
+        "data": cached["data"],
+    }
+
+
+async def _enqueue_fetch(user_id: str, password: str) -> Tuple[str, bool]:
+    """Queue a fetch through the single-flight registry: (task id, joined an existing one)."""
+
+    task_id = str(uuid.uuid4())
+    existing = await _claim_or_join(user_id, password, task_id)
+    if existing:
+        return existing, True
+
+    # Queue task to Celery
+    options: Dict[str, Any] = {"queue": settings.PROCESS_QUEUE} if settings.PROCESS_QUEUE else {}
+    try:
+        await async_celery.enqueue(fetch_itr_profile_task, user_id, password, task_id=task_id, **options)
+    except Exception:
+        await single_flight.release(user_id, task_id)
+        raise
+    return task_id, False
+
+
+async def _claim_or_join(user_id: str, password: str, task_id: str) -> Optional[str]:
     """
-    Get Celery task status and result.
+    Register `task_id` as the user's in-flight fetch, or return the id of the
+    queued/running task to join. A registered task that already finished
+    without releasing (e.g. its worker was killed) is taken over.
+    Only a caller presenting the same password joins: anyone else gets a task
+    of their own, which the worker's login lock still runs after the other.
     """
-    task_result = celery_app.AsyncResult(task_id)
+    check = await asyncio.to_thread(password_check, password)
+    for _ in range(3):
+        existing = await single_flight.claim(user_id, task_id, check)
+        if existing is None:
+            return None
+        status, _ = await task_status.get_status(existing["task_id"])
+        if status["status"] in states.READY_STATES:
+            if await single_flight.replace(user_id, existing["task_id"], task_id, check):
+                return None
+            continue
+        if await asyncio.to_thread(password_matches, password, existing):
+            return existing["task_id"]
+        return None
+    return None
+
+
+async def _read_credentials(request: Request) -> List[Any]:
+    """Parse a JSON array (or {"credentials": [...]}) or an NDJSON stream of credentials."""
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        items: List[Any] = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            items.extend(json.loads(line) for line in lines if line.strip())
+        if buffer.strip():
+            items.append(json.loads(buffer))
+        return items
+
+    body = await request.json()
+    if isinstance(body, dict):
+        body = body.get("credentials")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of credentials")
+    return body
+
+
+@router.post("/process/batch")
+async def process_itr_profile_batch(request: Request):
+    """
+    Queue many users at once as chunked Celery groups and return one batch id.
+    """
+    try:
+        items = await _read_credentials(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid credentials payload: {e}")
+
+    credentials: List[Dict[str, str]] = []
+    rejected: List[int] = []
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and item.get("userId") and item.get("password"):
+            credentials.append({"userId": item["userId"], "password": item["password"]})
+        else:
+            rejected.append(index)
+    if not credentials:
+        raise HTTPException(status_code=400, detail="No valid credentials (each needs userId and password)")
 
-    if task_result.successful():
-        result_payload = task_result.result
-    elif task_result.failed():
-        error = task_result.result
-        message = str(error)
-        result_payload = {"status": "error", "message": message}
-    elif task_result.state == states.RETRY:
-        retry_info = task_result.result
-        result_payload = {"status": "retry", "message": str(retry_info)}
-    else:
-        result_payload = None
+    try:
+        batch_id = str(uuid.uuid4())
+        size = max(1, settings.BATCH_CHUNK_SIZE)
+        chunks = [credentials[i:i + size] for i in range(0, len(credentials), size)]
+        await batch_tracker.create_batch(batch_id, len(credentials), len(chunks))
+        await async_celery.run_blocking(group(
+            fetch_itr_profiles_batch_task.s(chunk, batch_id=batch_id, offset=number * size)
+            for number, chunk in enumerate(chunks)
+        ).apply_async)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     return {
-        "task_id": task_id,
-        "status": task_result.status,
-        "result": result_payload,
+        "status": "queued",
+        "batch_id": batch_id,
+        "total": len(credentials),
+        "chunks": len(chunks),
+        "rejected": rejected,
     }
+
+
+@router.get("/process/batch/{batch_id}")
+async def get_batch_status(batch_id: str, offset: int = 0, limit: int = 100):
+    """
+    Aggregate progress of a bulk submission plus a page of finished results.
+    """
+    status = await batch_tracker.get_batch_status(batch_id, max(0, offset), min(max(1, limit), 1000))
+    if not status:
+        raise HTTPException(status_code=404, detail="Unknown or expired batch id")
+    return status
+
+
+def _parse_ids(raw_ids: List[str]) -> List[str]:
+    task_ids = list(dict.fromkeys(i.strip() for i in raw_ids if i and i.strip()))
+    if not task_ids:
+        raise HTTPException(status_code=400, detail="No task ids given")
+    if len(task_ids) > task_status.MAX_IDS_PER_LOOKUP:
+        raise HTTPException(status_code=400, detail=f"At most {task_status.MAX_IDS_PER_LOOKUP} ids per lookup")
+    return task_ids
+
+
+@router.get("/status")
+async def get_task_statuses(ids: str = ""):
+    """
+    Status of many tasks at once: /status?ids=a,b,c (one pipelined Redis read).
+    """
+    return {"tasks": await task_status.lookup_many(_parse_ids(ids.split(",")))}
+
+
+@router.post("/status")
+async def post_task_statuses(request: Request):
+    """
+    Same as GET /status for long id lists: body {"ids": [...]}.
+    """
+    body = await request.json()
+    raw_ids = body.get("ids") if isinstance(body, dict) else body
+    if not isinstance(raw_ids, list):
+        raise HTTPException(status_code=400, detail="Expected {\"ids\": [...]}")
+    return {"tasks": await task_status.lookup_many(_parse_ids([str(i) for i in raw_ids]))}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison (RFC 9110 13.1.2): W/"x" matches "x".
+    return "*" in candidates or etag.removeprefix("W/") in (c.removeprefix("W/") for c in candidates)
+
+
+@router.get("/status/{task_id}")
+async def get_task_status(task_id: str, request: Request):
+    """
+    Get Celery task status and result.
+    Carries an ETag; a matching If-None-Match gets 304 with no body.
+    """
+    status, etag = await task_status.get_status(task_id)
+
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(jsonable_encoder({"task_id": task_id, **status}), headers={"ETag": etag})
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/status/{task_id}/stream")
+async def stream_task_status(task_id: str):
+    """
+    Push task state transitions as Server-Sent Events until the task finishes.
+    """
+    return StreamingResponse(
+        status_stream.task_events(task_id), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.get("/process/batch/{batch_id}/stream")
+async def stream_batch_status(batch_id: str):
+    """
+    Push one Server-Sent Event per finished user of a bulk submission, then a final "done".
+    """
+    return StreamingResponse(
+        status_stream.batch_events(batch_id), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+async def _require_profile_store() -> ProfileStore:
+    store = await open_profile_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Profile store is not configured (PROFILE_STORE_PATH)")
+    return store
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds or an ISO-8601 timestamp (UTC when no offset is given)."""
+
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+@router.get("/profiles/changes")
+async def get_profile_changes(after: int = 0, limit: int = 500, pan: Optional[str] = None):
+    """
+    Field-level changes of stored profiles in commit order.
+    Pass the returned `next` as `after` to continue from where you left off.
+    """
+    store = await _require_profile_store()
+    changes = await asyncio.to_thread(store.changes, max(0, after), min(max(1, limit), 5000), pan)
+    return {"changes": changes, "next": changes[-1]["seq"] if changes else max(0, after)}
+
+
+@router.get("/profiles/changes/stream")
+async def stream_profile_changes(request: Request, after: Optional[int] = None, pan: Optional[str] = None):
+    """
+    Push the change feed as Server-Sent Events, resuming from Last-Event-ID on reconnect.
+    """
+    store = await _require_profile_store()
+    if after is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        after = int(last_event_id) if last_event_id.isdigit() else 0
+    return StreamingResponse(
+        status_stream.change_events(store, after, pan), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.get("/profiles/{pan}")
+async def get_stored_profile(pan: str, at: Optional[str] = None):
+    """
+    Latest stored profile of a PAN, or the one current at `at` (epoch or ISO time).
+    """
+    store = await _require_profile_store()
+    profile = await asyncio.to_thread(store.latest, pan, _parse_time(at))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No stored profile for this PAN")
+    return profile
+
+
+@router.get("/profiles/{pan}/history")
+async def get_stored_profile_history(pan: str, limit: int = 50, before: Optional[str] = None):
+    """
+    Stored profiles of a PAN, newest first. Pass the last `fetched_at` as `before` for the next page.
+    """
+    store = await _require_profile_store()
+    profiles = await asyncio.to_thread(store.history, pan, min(max(1, limit), 500), _parse_time(before))
+    return {"pan": pan.strip().upper(), "profiles": profiles}
+
+
+@router.get("/metrics/selectors")
+async def get_selector_metrics():
+    """
+    Hit rate and latency of every login/profile selector, to spot portal DOM drift.
+    """
+    try:
+        return {"selectors": await selector_metrics()}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Selector stats unavailable: {e}")
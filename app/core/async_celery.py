@@ -0,0 +1,38 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from celery.result import AsyncResult
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+
+# Dedicated threads for broker/backend I/O so API handlers never block the event loop.
+# apply_async draws connections from Celery's producer pool, which is sized by
+# broker_pool_limit; keep the thread count at or below it.
+_executor = ThreadPoolExecutor(max_workers=settings.CELERY_IO_THREADS, thread_name_prefix="celery-io")
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def enqueue(task, *args: Any, **options: Any) -> AsyncResult:
+    """Non-blocking `task.apply_async(args=args, **options)`."""
+
+    return await run_blocking(task.apply_async, args=args, **options)
+
+
+async def get_meta(task_id: str) -> Dict[str, Any]:
+    """Non-blocking raw backend meta of a task (status, result, date_done, ...)."""
+
+    return await run_blocking(celery_app.backend.get_task_meta, task_id)
+
+
+async def get_state(task_id: str) -> Tuple[str, Any]:
+    """Non-blocking (state, result) of a task, read with one backend round trip."""
+
+    meta = await get_meta(task_id)
+    return meta["status"], meta.get("result")
@@ -7,12 +7,17 @@ load_dotenv()
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# "prefork": one Playwright session per process.
+# "asyncio": one process, ASYNC_WORKER_CONCURRENCY sessions sharing its event loop and browser.
+WORKER_MODE = os.getenv("WORKER_MODE", "prefork").lower()
+ASYNC_WORKER_CONCURRENCY = int(os.getenv("ASYNC_WORKER_CONCURRENCY", "8"))
+
 # Celery app configuration
 celery_app = Celery(
     "itr_tasks",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.profile_tasks"],
+    include=["app.tasks.profile_tasks", "app.tasks.worker_hooks"],
 )
 
 # Robust config
@@ -32,6 +37,15 @@ celery_app.conf.update(
     result_expires=3600,
 )
 
+if WORKER_MODE == "asyncio":
+    # Thread pool slots only hand coroutines to the shared worker loop, which
+    # bounds them again with a semaphore of the same size.
+    celery_app.conf.update(
+        worker_pool="threads",
+        worker_concurrency=ASYNC_WORKER_CONCURRENCY,
+        worker_prefetch_multiplier=1,
+    )
+
 @celery_app.task(bind=True, name="app.debug_task")
 def debug_task(self):
     print(f"[debug] Executed: {self.request!r}")
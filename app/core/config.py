@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -10,5 +12,63 @@ class Settings(BaseSettings):
     PORT: int = 8000
     API_PREFIX: str = "/api/itr"
     API_KEY: str = "change-me"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CELERY_IO_THREADS: int = 8
+    STATUS_CACHE_SIZE: int = 10000  # finished task statuses kept in API memory
+    # Queue for /process fetches instead of the routed "itr" queue; point it at a
+    # queue no worker consumes to load-test the API without logging in anywhere.
+    PROCESS_QUEUE: Optional[str] = None
+
+    # Browser
+    HEADLESS: bool = True
+    CHROME_PATH: Optional[str] = None
+    BROWSER_LAUNCH_PROFILE: str = "default"  # "default" or "lite"
+
+    # Per-worker browser pool
+    BROWSER_POOL_ENABLED: bool = True
+    BROWSER_POOL_SIZE: int = 1
+    BROWSER_POOL_MAX_USES: int = 50
+    BROWSER_POOL_MAX_RSS_MB: int = 0  # 0 disables the RSS check
+
+    # Batch fetches
+    BATCH_CONCURRENCY: int = 4
+    BATCH_TASK_TIME_LIMIT: int = 6 * 3600
+    BATCH_CHUNK_SIZE: int = 50
+    BATCH_RESULT_TTL_SECONDS: int = 86400
+
+    # One fetch per userId at a time
+    SINGLE_FLIGHT_TTL_SECONDS: int = 3600  # safety expiry of the in-flight registration
+    LOGIN_LOCK_TIMEOUT_SECONDS: int = 600  # matches task_time_limit
+    LOGIN_LOCK_WAIT_SECONDS: int = 120
+
+    # Latest successful profile per user, served to /process with max_age_seconds (0 disables)
+    PROFILE_CACHE_TTL_SECONDS: int = 7 * 86400
+
+    # Local SQLite (WAL) history of fetched profiles (leave empty to disable)
+    PROFILE_STORE_PATH: Optional[str] = None
+    PROFILE_STORE_BATCH_SIZE: int = 200
+    PROFILE_STORE_FLUSH_SECONDS: float = 1.0
+    PROFILE_STORE_SNAPSHOT_EVERY: int = 10  # full copy every N versions of a PAN, deltas in between
+    PROFILE_FEED_POLL_SECONDS: float = 1.0
+
+    # Portal session reuse (Fernet key; leave empty to always log in)
+    SESSION_CACHE_KEY: Optional[str] = None
+    SESSION_CACHE_TTL_SECONDS: int = 900
+
+    # Adaptive selector ordering
+    SELECTOR_STATS_ENABLED: bool = True
+    SELECTOR_STATS_WINDOW: int = 500
+    SELECTOR_STATS_REFRESH_SECONDS: int = 60
+
+    # Node-wide cache of the portal's JS/CSS bundles (leave empty to disable)
+    STATIC_CACHE_DIR: Optional[str] = None
+    STATIC_CACHE_MAX_MB: int = 256
+    STATIC_CACHE_REVALIDATE_SECONDS: int = 3600
+    STATIC_CACHE_URL_PATTERN: str = r"^https://eportal\.incometax\.gov\.in/.*\.(js|css)(\?.*)?$"
+
+    # Per-slot persistent Chromium profiles cloned from a warmed template
+    # (used when the browser pool is off; leave empty to disable)
+    PROFILE_ROOT_DIR: Optional[str] = None
+    PROFILE_DIR_MAX_MB: int = 512
 
 settings = Settings()
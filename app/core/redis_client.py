@@ -0,0 +1,37 @@
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_sync_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Process-wide blocking Redis client (connection pooled)."""
+
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _sync_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Process-wide asyncio Redis client.
+    Must only be used from the one event loop of the process (worker loop or uvicorn loop).
+    """
+
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL)
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
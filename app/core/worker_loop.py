@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional
+
+from app.core.logger import get_logger
+
+logger = get_logger("worker_loop")
+
+ShutdownHook = Callable[[], Awaitable[None]]
+
+
+class WorkerLoop:
+    """
+    A single asyncio loop running in a background thread of a worker process.
+    Synchronous Celery tasks submit coroutines to it, so anything async
+    (browser pool, HTTP clients, caches) can live for the whole process.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[ShutdownHook] = []
+        self._max_concurrency = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self) -> None:
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                return
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="worker-event-loop", daemon=True)
+            self._loop = loop
+            self._thread.start()
+            started.wait()
+            logger.info("[worker] Event loop started")
+
+    def set_max_concurrency(self, limit: int) -> None:
+        """Bound how many submitted coroutines run at once (0 means unbounded)."""
+
+        self._max_concurrency = max(0, limit)
+        self._semaphore = None
+
+    async def _bounded(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        if not self._max_concurrency:
+            return await coro
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            return await coro
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._bounded(coro), self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the worker loop and block the calling thread for its result."""
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def add_shutdown_hook(self, hook: ShutdownHook) -> None:
+        self._shutdown_hooks.append(hook)
+
+    async def _shutdown(self) -> None:
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"[worker] Shutdown hook failed: {e}")
+        self._shutdown_hooks.clear()
+
+        current = asyncio.current_task()
+        pending = [t for t in asyncio.all_tasks() if t is not current]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stop(self, timeout: float = 30) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or loop.is_closed():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout)
+            except Exception as e:
+                logger.error(f"[worker] Event loop shutdown incomplete: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout)
+            if not loop.is_running():
+                loop.close()
+            self._loop = None
+            self._thread = None
+            logger.info("[worker] Event loop stopped")
+
+
+worker_loop = WorkerLoop()
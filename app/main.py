@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.controllers import profile_controller
 from app.core.config import settings
 from app.core.itr_middleware import ITRMiddleware
+from app.services.profile_store import open_profile_store
 
 # Fix for Playwright on Windows (important for RDP)
 if sys.platform.startswith("win"):
@@ -36,6 +37,14 @@ app.add_middleware(ITRMiddleware)
 def health_check():
     return {"status": "ok", "service": settings.PROJECT_NAME}
 
+@app.on_event("startup")
+async def _open_profile_store():
+    # Migrate the profile store before serving, off the event loop.
+    try:
+        await open_profile_store()
+    except Exception as e:
+        print(f"[init] Profile store failed to open, retrying on first use: {e}")
+
 # Routers
 app.include_router(profile_controller.router, prefix=settings.API_PREFIX)
 
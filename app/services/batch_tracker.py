@@ -0,0 +1,93 @@
+import json
+import time
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+
+BATCH_KEY_PREFIX = "itr:batch:"
+COUNTERS = ("running", "succeeded", "failed")
+
+
+def _batch_key(batch_id: str) -> str:
+    return f"{BATCH_KEY_PREFIX}{batch_id}"
+
+
+def _results_key(batch_id: str) -> str:
+    return f"{BATCH_KEY_PREFIX}{batch_id}:results"
+
+
+def events_channel(batch_id: str) -> str:
+    return f"{BATCH_KEY_PREFIX}{batch_id}:events"
+
+
+def _counts(raw: Dict[bytes, bytes]) -> Dict[str, int]:
+    fields = {k.decode(): v.decode() for k, v in raw.items()}
+    counts = {name: int(fields.get(name, 0)) for name in COUNTERS}
+    counts["queued"] = max(0, int(fields.get("total", 0)) - sum(counts.values()))
+    return counts
+
+
+async def create_batch(batch_id: str, total: int, chunks: int) -> None:
+    key = _batch_key(batch_id)
+    pipe = get_async_redis().pipeline(transaction=True)
+    pipe.hset(key, mapping={"total": total, "chunks": chunks, "created_at": time.time(), **{c: 0 for c in COUNTERS}})
+    pipe.expire(key, settings.BATCH_RESULT_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def mark_chunk_started(batch_id: str, size: int) -> None:
+    await get_async_redis().hincrby(_batch_key(batch_id), "running", size)
+
+
+async def record_result(batch_id: str, item: Dict[str, Any]) -> None:
+    """
+    Count one finished user and append its result (O(1) Redis writes), then
+    publish the new counts on the batch's events channel for streaming clients.
+    """
+    outcome = "succeeded" if item.get("status") == "SUCCESS" else "failed"
+    key, results_key = _batch_key(batch_id), _results_key(batch_id)
+    client = get_async_redis()
+    pipe = client.pipeline(transaction=True)
+    pipe.hincrby(key, "running", -1)
+    pipe.hincrby(key, outcome, 1)
+    pipe.rpush(results_key, json.dumps(item, default=str))
+    pipe.expire(results_key, settings.BATCH_RESULT_TTL_SECONDS)
+    pipe.hgetall(key)
+    *_, raw = await pipe.execute()
+
+    event = {
+        "index": item.get("index"),
+        "userId": item.get("userId"),
+        "status": item.get("status"),
+        "counts": _counts(raw),
+    }
+    await client.publish(events_channel(batch_id), json.dumps(event))
+
+
+async def get_batch_status(batch_id: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """Aggregate counts plus one page of finished results, without touching individual tasks."""
+
+    pipe = get_async_redis().pipeline(transaction=False)
+    pipe.hgetall(_batch_key(batch_id))
+    pipe.llen(_results_key(batch_id))
+    if limit > 0:
+        pipe.lrange(_results_key(batch_id), offset, offset + limit - 1)
+    raw, finished, *pages = await pipe.execute()
+    page = pages[0] if pages else []
+    if not raw:
+        return {}
+
+    total = int(raw[b"total"])
+    counts = _counts(raw)
+    results: List[Dict[str, Any]] = [json.loads(item) for item in page]
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "counts": counts,
+        "done": counts["succeeded"] + counts["failed"] >= total,
+        "results": results,
+        "offset": offset,
+        "limit": limit,
+        "finished": finished,
+    }
@@ -0,0 +1,269 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+from app.core.config import settings
+from app.core.logger import get_logger
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+log = get_logger("browser_pool")
+
+DEFAULT_BROWSER_ARGS: List[str] = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-blink-features=AutomationControlled",
+]
+
+# Minimal-footprint Chromium for this workload: no GPU, extensions, background
+# services or component updates, cheap font rendering and no image decoding.
+LITE_BROWSER_ARGS: List[str] = DEFAULT_BROWSER_ARGS + [
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-hang-monitor",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache,AutofillServerCommunication",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+    "--font-render-hinting=none",
+    "--disable-font-subpixel-positioning",
+    "--blink-settings=imagesEnabled=false",
+    "--password-store=basic",
+    "--use-mock-keychain",
+]
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    args: List[str]
+    context_options: Dict[str, Any]
+
+
+LAUNCH_PROFILES: Dict[str, LaunchProfile] = {
+    "default": LaunchProfile(args=DEFAULT_BROWSER_ARGS, context_options={}),
+    "lite": LaunchProfile(
+        args=LITE_BROWSER_ARGS,
+        context_options={
+            "viewport": {"width": 1024, "height": 700},
+            "device_scale_factor": 1,
+            "reduced_motion": "reduce",
+        },
+    ),
+}
+
+
+def get_launch_profile(name: Optional[str]) -> LaunchProfile:
+    profile = LAUNCH_PROFILES.get((name or "default").lower())
+    if profile is None:
+        log.warning("Unknown launch profile %s; using default", name)
+        return LAUNCH_PROFILES["default"]
+    return profile
+
+
+@dataclass
+class BrowserPoolConfig:
+    size: int = 1
+    max_uses: int = 50
+    max_rss_mb: int = 0
+    headless: bool = True
+    chrome_path: Optional[str] = None
+    args: List[str] = field(default_factory=lambda: list(DEFAULT_BROWSER_ARGS))
+    context_options: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> "BrowserPoolConfig":
+        profile = get_launch_profile(settings.BROWSER_LAUNCH_PROFILE)
+        return cls(
+            size=max(1, settings.BROWSER_POOL_SIZE),
+            max_uses=settings.BROWSER_POOL_MAX_USES,
+            max_rss_mb=settings.BROWSER_POOL_MAX_RSS_MB,
+            headless=settings.HEADLESS,
+            chrome_path=settings.CHROME_PATH,
+            args=list(profile.args),
+            context_options=dict(profile.context_options),
+        )
+
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.uses = 0
+        self.in_flight = 0
+        self.retiring = False
+        self.closed = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+def _chromium_rss_mb() -> float:
+    """Resident memory of the Playwright driver and browsers spawned by this process."""
+
+    if psutil is None:
+        return 0.0
+    total = 0
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error:
+        return 0.0
+    return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instances owned by one worker process.
+    Each checkout gets a fresh, isolated BrowserContext; browsers are recycled
+    after `max_uses` checkouts or when RSS grows past `max_rss_mb`, and are
+    relaunched transparently if they crash.
+    """
+
+    def __init__(self, config: Optional[BrowserPoolConfig] = None):
+        self.config = config or BrowserPoolConfig.from_settings()
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[Optional[_PooledBrowser]] = []
+        self._lock = asyncio.Lock()
+        self._next = 0
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        if self._playwright is not None:
+            return
+        self._playwright = await async_playwright().start()
+        self._slots = [None] * self.config.size
+        for index in range(self.config.size):
+            self._slots[index] = await self._launch()
+        log.info("Browser pool started with %d browser(s)", self.config.size)
+
+    async def close(self) -> None:
+        async with self._lock:
+            for slot in self._slots:
+                if slot is not None:
+                    await self._close_browser(slot)
+            self._slots = []
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+        log.info("Browser pool stopped")
+
+    async def _launch(self) -> _PooledBrowser:
+        launch_kwargs: dict = {"headless": self.config.headless, "args": list(self.config.args)}
+        if self.config.chrome_path and os.path.exists(self.config.chrome_path):
+            launch_kwargs["executable_path"] = self.config.chrome_path
+        browser = await self._playwright.chromium.launch(**launch_kwargs)
+        return _PooledBrowser(browser)
+
+    async def _close_browser(self, slot: _PooledBrowser) -> None:
+        if slot.closed:
+            return
+        slot.closed = True
+        try:
+            await slot.browser.close()
+        except Exception:
+            pass
+
+    async def _retire(self, slot: _PooledBrowser) -> None:
+        slot.retiring = True
+        if slot.in_flight == 0:
+            await self._close_browser(slot)
+
+    async def _checkout(self) -> _PooledBrowser:
+        if self._playwright is None:
+            raise RuntimeError("Browser pool is not started")
+        async with self._lock:
+            index = self._next % len(self._slots)
+            self._next += 1
+            slot = self._slots[index]
+            if slot is None or not slot.healthy:
+                if slot is not None:
+                    if not slot.browser.is_connected():
+                        log.warning("Browser %d disconnected; relaunching", index)
+                    await self._retire(slot)
+                slot = await self._launch()
+                self._slots[index] = slot
+            slot.uses += 1
+            slot.in_flight += 1
+            if self.config.max_uses and slot.uses >= self.config.max_uses:
+                log.info("Browser %d reached %d uses; recycling after current work", index, slot.uses)
+                slot.retiring = True
+            return slot
+
+    async def _release(self, slot: _PooledBrowser) -> None:
+        async with self._lock:
+            slot.in_flight -= 1
+            if not slot.retiring and self.config.max_rss_mb:
+                rss_per_browser = _chromium_rss_mb() / max(1, len(self._slots))
+                if rss_per_browser > self.config.max_rss_mb:
+                    log.info("Browser RSS %.0f MB over %d MB limit; recycling", rss_per_browser, self.config.max_rss_mb)
+                    slot.retiring = True
+            if slot.retiring and slot.in_flight == 0:
+                await self._close_browser(slot)
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs: Any) -> AsyncIterator[BrowserContext]:
+        slot = await self._checkout()
+        context: Optional[BrowserContext] = None
+        try:
+            context = await slot.browser.new_context(**{**self.config.context_options, **context_kwargs})
+            yield context
+        finally:
+            try:
+                if context:
+                    await context.close()
+            except Exception:
+                pass
+            await self._release(slot)
+
+
+# =========================
+# Per-process pool
+# =========================
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """Return the running pool of this process, or None when tasks should launch their own browser."""
+
+    if _pool is not None and _pool.started:
+        return _pool
+    return None
+
+
+async def start_browser_pool(config: Optional[BrowserPoolConfig] = None) -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(config)
+    await _pool.start()
+    return _pool
+
+
+async def stop_browser_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
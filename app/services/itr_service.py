@@ -4,15 +4,26 @@ import sys
 import json
 import asyncio
 import random
+import time
 import argparse
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Callable, Awaitable, Tuple
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, AsyncIterator, Dict, List, Optional, Set, Callable, Awaitable, Tuple
 from datetime import datetime
+from urllib.parse import urlsplit
 
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, BrowserContext, TimeoutError as PlaywrightTimeoutError
 from app.core.logger import get_logger
+from app.services.browser_pool import BrowserPool, BrowserPoolConfig, get_browser_pool, get_launch_profile
+from app.services.profile_api import DEFAULT_PROFILE_API_PATTERN, ProfileResponseListener, map_profile_rows
+from app.services.profile_dirs import get_profile_dir_manager
+from app.services.request_blocking import RequestBlocker, blocked_types_from_env
+from app.services.selector_stats import get_selector_stats
+from app.services.session_cache import capture_session, get_session_cache, restore_session_storage
+from app.services.static_cache import get_static_cache
+from app.core.config import settings
 from app.utils.helpers import sanitize_input
 
 # =========================
@@ -22,6 +33,10 @@ from app.utils.helpers import sanitize_input
 load_dotenv()
 log = get_logger("itr_service")
 
+DEFAULT_LOGIN_URL = "https://eportal.incometax.gov.in/iec/foservices/#/login"
+DEFAULT_PROFILE_URL = "https://eportal.incometax.gov.in/iec/foservices/#/dashboard/myProfile/profileDetail"
+
+
 @dataclass
 class ScraperConfig:
     user_id: str
@@ -36,9 +51,17 @@ class ScraperConfig:
     retries: int = 3
     retry_backoff_base_ms: int = 700
     block_media: bool = True
-
-    login_url: str = "https://eportal.incometax.gov.in/iec/foservices/#/login"
-    profile_url: str = "https://eportal.incometax.gov.in/iec/foservices/#/dashboard/myProfile/profileDetail"
+    launch_profile: str = field(default_factory=lambda: os.getenv("BROWSER_LAUNCH_PROFILE", "default"))
+    block_resource_types: List[str] = field(default_factory=blocked_types_from_env)
+    reuse_session: bool = True
+    spa_navigation: bool = True
+
+    login_url: str = field(default_factory=lambda: os.getenv("LOGIN_URL") or DEFAULT_LOGIN_URL)
+    profile_url: str = field(default_factory=lambda: os.getenv("PROFILE_URL") or DEFAULT_PROFILE_URL)
+    # Read the profile from the SPA's own API response; None keeps DOM scraping only.
+    profile_api_pattern: Optional[str] = field(
+        default_factory=lambda: os.getenv("PROFILE_API_PATTERN", DEFAULT_PROFILE_API_PATTERN) or None
+    )
 
 
 # =========================
@@ -58,6 +81,40 @@ async def wait_until(predicate_async: Callable[[], Awaitable[bool]], timeout_ms:
     return False
 
 
+async def wait_until_event(
+    emitter,
+    event: str,
+    predicate: Callable[[], bool],
+    timeout_ms: int,
+) -> bool:
+    """
+    Event-backed variant of wait_until: `predicate` is checked once up front and
+    then only when `emitter` fires `event` (e.g. page "framenavigated", which also
+    covers SPA hash-route changes), so it resolves without polling delay.
+    """
+    loop = asyncio.get_running_loop()
+    satisfied: asyncio.Future = loop.create_future()
+
+    def _check(*_args) -> None:
+        if satisfied.done():
+            return
+        try:
+            if predicate():
+                satisfied.set_result(True)
+        except Exception:
+            pass
+
+    emitter.on(event, _check)
+    try:
+        _check()
+        await asyncio.wait_for(satisfied, timeout_ms / 1000)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        emitter.remove_listener(event, _check)
+
+
 async def retry_async(fn: Callable[[], Awaitable[Any]], attempts: int, base_backoff_ms: int, on_retry: Optional[Callable[[int, Exception], None]] = None) -> Any:
     last_exc = None
     for i in range(1, attempts + 1):
@@ -76,6 +133,125 @@ async def retry_async(fn: Callable[[], Awaitable[Any]], attempts: int, base_back
 
 SelectorList = List[str]
 
+USER_ID_SELECTORS: SelectorList = [
+    'input[name="panAadhaarUserId"]',
+    'input[formcontrolname="panAadhaarUserId"]',
+    'input[name="userId"]',
+    'input#panAdhaarUserId',
+    'input[type="text"][autocomplete="username"]',
+]
+CONTINUE_SELECTORS: SelectorList = [
+    'button[type="submit"]:has-text("Continue")',
+    'button:has-text("Continue")',
+    'text="Continue"',
+]
+PASSWORD_SELECTORS: SelectorList = [
+    'input[type="password"]',
+    'input[formcontrolname="password"]',
+    'input[name="password"]',
+    'input#password',
+]
+LOGIN_SELECTORS: SelectorList = [
+    'button[type="submit"]:has-text("Login")',
+    'button:has-text("Login")',
+    'text="Login"',
+]
+
+
+# =========================
+# Progress Phases
+# =========================
+
+PhaseCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class PhaseTracker:
+    """
+    Timestamps the phases of one fetch (launching, login_user, login_password,
+    dashboard, profile_nav, extracting, done) and reports each transition.
+    """
+
+    def __init__(self, on_phase: Optional[PhaseCallback] = None):
+        self._on_phase = on_phase
+        self._phases: List[Tuple[str, float]] = []
+
+    async def enter(self, phase: str) -> None:
+        self._phases.append((phase, time.time()))
+        if self._on_phase:
+            try:
+                await self._on_phase(self.snapshot())
+            except Exception as e:
+                log.debug("Phase callback failed: %s", e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        phases = []
+        for index, (phase, started_at) in enumerate(self._phases):
+            ended_at = self._phases[index + 1][1] if index + 1 < len(self._phases) else now
+            phases.append({
+                "phase": phase,
+                "started_at": datetime.utcfromtimestamp(started_at).isoformat() + "Z",
+                "elapsed_ms": round((ended_at - started_at) * 1000),
+            })
+        return {"phase": phases[-1]["phase"] if phases else None, "phases": phases}
+
+
+# =========================
+# Readiness Signals
+# =========================
+
+# True once the profile screen rendered at least one non-empty key/value row.
+PROFILE_ROWS_READY_JS = """
+() => Array.from(document.querySelectorAll('table tr, dt')).some(
+    (row) => (row.innerText || row.textContent || '').trim().length > 0
+)
+"""
+
+
+async def settle(signal: Awaitable[Any], cap_ms: int) -> bool:
+    """
+    Wait for a readiness signal, but never longer than `cap_ms`.
+    Replaces fixed sleeps: returns as soon as the page is ready and never raises,
+    so a missed signal costs at most what the old sleep did.
+    """
+    try:
+        return await asyncio.wait_for(signal, cap_ms / 1000) is not False
+    except Exception:
+        return False
+
+
+async def first_ready(*signals: Awaitable[Any]) -> Any:
+    """Resolve with whichever readiness signal completes first, cancelling the rest."""
+
+    waits = [asyncio.ensure_future(signal) for signal in signals]
+    try:
+        done, _ = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        return next(iter(done)).result()
+    finally:
+        for wait in waits:
+            if not wait.done():
+                wait.cancel()
+
+
+def login_form_ready(page, timeout_ms: int) -> Awaitable[Any]:
+    return page.wait_for_selector(", ".join(USER_ID_SELECTORS), state="visible", timeout=timeout_ms)
+
+
+def password_field_ready(page, timeout_ms: int) -> Awaitable[Any]:
+    return page.wait_for_selector(", ".join(PASSWORD_SELECTORS), state="visible", timeout=timeout_ms)
+
+
+def dashboard_reached(page, timeout_ms: int) -> Awaitable[Any]:
+    return wait_until_event(page, "framenavigated", lambda: "/dashboard" in page.url, timeout_ms)
+
+
+def profile_rows_ready(page, timeout_ms: int) -> Awaitable[Any]:
+    return page.wait_for_function(PROFILE_ROWS_READY_JS, timeout=timeout_ms)
+
+
+# Selector stats writes in flight; referenced so they are not garbage collected mid-write.
+_stats_tasks: Set["asyncio.Task[None]"] = set()
+
 
 async def _wait_for_first_selector(
     page,
@@ -84,17 +260,71 @@ async def _wait_for_first_selector(
     description: str,
     timeout_ms: int,
 ) -> Any:
-    """Return the first element handle matching any selector, raising a helpful error otherwise."""
+    """
+    Race all selectors and return the first visible element handle, raising a helpful error otherwise.
+    Losing waits are cancelled; when several match at once the selector with the
+    best recorded hit rate wins. Every selector that matched, not just the
+    winner, is counted as a hit in those stats, recorded in the background.
+    """
+
+    stats = get_selector_stats()
+    if stats:
+        selectors = await stats.order(description, selectors)
+
+    started = asyncio.get_running_loop().time()
 
+    async def _record(hits: Dict[str, float], unresolved: List[str]) -> None:
+        # Waits still pending when the winner resolved may have matched as well.
+        latency_ms = (asyncio.get_running_loop().time() - started) * 1000
+        for selector in unresolved:
+            try:
+                if await page.locator(selector).first.is_visible():
+                    hits[selector] = latency_ms
+            except Exception:  # pragma: no cover - page may be gone already
+                pass
+        await stats.record(description, selectors, hits)
+
+    def _record_later(hits: Dict[str, float], unresolved: List[str]) -> None:
+        if stats:
+            task = asyncio.create_task(_record(hits, unresolved))
+            _stats_tasks.add(task)
+            task.add_done_callback(_stats_tasks.discard)
+
+    waits = {
+        asyncio.ensure_future(page.wait_for_selector(selector, timeout=timeout_ms, state="visible")): selector
+        for selector in selectors
+    }
     last_error: Optional[Exception] = None
-    for selector in selectors:
-        try:
-            element = await page.wait_for_selector(selector, timeout=timeout_ms, state="visible")
-            if element:
-                return element
-        except PlaywrightTimeoutError as exc:  # pragma: no cover - depends on live page
-            last_error = exc
-            log.debug("%s not found with selector %s", description, selector)
+    pending = set(waits)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            found: List[Tuple[str, Any]] = []
+            error: Optional[BaseException] = None
+            for task, selector in waits.items():
+                if task not in done:
+                    continue
+                exc = task.exception()
+                if exc is None:
+                    if task.result():
+                        found.append((selector, task.result()))
+                elif isinstance(exc, PlaywrightTimeoutError):  # pragma: no cover - depends on live page
+                    last_error = exc
+                    log.debug("%s not found with selector %s", description, selector)
+                elif error is None:
+                    error = exc
+            if found:
+                latency_ms = (asyncio.get_running_loop().time() - started) * 1000
+                _record_later({selector: latency_ms for selector, _ in found}, [waits[task] for task in pending])
+                return found[0][1]
+            if error is not None:
+                raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    _record_later({}, [])
     selectors_joined = ", ".join(selectors)
     raise PlaywrightTimeoutError(f"Unable to locate {description}. Tried selectors: {selectors_joined}") from last_error
 
@@ -107,87 +337,74 @@ async def _click_first(page, selectors: SelectorList, *, description: str, timeo
 async def robust_fill_user_id_and_continue(page, cfg: ScraperConfig) -> None:
     """Fill the user id field and press continue handling minor DOM differences."""
 
-    user_id_selectors: SelectorList = [
-        'input[name="panAadhaarUserId"]',
-        'input[formcontrolname="panAadhaarUserId"]',
-        'input[name="userId"]',
-        'input#panAdhaarUserId',
-        'input[type="text"][autocomplete="username"]',
-    ]
-    continue_selectors: SelectorList = [
-        'button[type="submit"]:has-text("Continue")',
-        'button:has-text("Continue")',
-        'text="Continue"',
-    ]
-
     log.debug("Filling user id for %s", cfg.user_id)
     user_input = await _wait_for_first_selector(
         page,
-        user_id_selectors,
+        USER_ID_SELECTORS,
         description="user id input",
         timeout_ms=cfg.action_timeout_ms,
     )
     await user_input.fill(cfg.user_id)
-    await _click_first(page, continue_selectors, description="continue button", timeout_ms=cfg.action_timeout_ms)
+    await _click_first(page, CONTINUE_SELECTORS, description="continue button", timeout_ms=cfg.action_timeout_ms)
 
 
 async def robust_fill_password_and_submit(page, cfg: ScraperConfig) -> None:
     """Fill the password box and submit the form."""
 
-    password_selectors: SelectorList = [
-        'input[type="password"]',
-        'input[formcontrolname="password"]',
-        'input[name="password"]',
-        'input#password',
-    ]
-    login_selectors: SelectorList = [
-        'button[type="submit"]:has-text("Login")',
-        'button:has-text("Login")',
-        'text="Login"',
-    ]
-
     password_input = await _wait_for_first_selector(
         page,
-        password_selectors,
+        PASSWORD_SELECTORS,
         description="password input",
         timeout_ms=cfg.action_timeout_ms,
     )
     await password_input.fill(cfg.password)
-    await _click_first(page, login_selectors, description="login button", timeout_ms=cfg.action_timeout_ms)
+    await _click_first(page, LOGIN_SELECTORS, description="login button", timeout_ms=cfg.action_timeout_ms)
+
+
+async def _hash_navigate(page, route: str, timeout_ms: int) -> bool:
+    """Switch the already booted SPA to `route` by changing location.hash."""
+
+    def _on_route() -> bool:
+        return page.url.partition("#")[2].startswith(route)
+
+    try:
+        await page.evaluate("(route) => { window.location.hash = route; }", route)
+    except Exception as e:
+        log.debug("Hash navigation failed: %s", e)
+        return False
+    return await wait_until_event(page, "framenavigated", _on_route, timeout_ms)
 
 
 async def spa_safe_goto_profile(page, cfg: ScraperConfig) -> None:
-    """Navigate to the profile page and ensure the SPA finished routing."""
+    """
+    Navigate to the profile page and ensure the SPA finished routing.
+    When the app is already loaded, only the hash route changes so Angular does
+    not boot again; a full page.goto is the fallback.
+    """
 
-    await page.goto(cfg.profile_url, wait_until="domcontentloaded", timeout=cfg.navigation_timeout_ms)
+    base_profile_url, _, profile_route = cfg.profile_url.partition("#")
 
-    async def _is_on_profile() -> bool:
-        base_profile_url = cfg.profile_url.split("#")[0]
-        return page.url.startswith(base_profile_url)
+    routed = False
+    if cfg.spa_navigation and profile_route and page.url.startswith(base_profile_url):
+        routed = await _hash_navigate(page, profile_route, cfg.action_timeout_ms)
+        if not routed:
+            log.info("In-app navigation to profile did not settle; reloading %s", cfg.profile_url)
 
-    if not await wait_until(_is_on_profile, cfg.navigation_timeout_ms):
-        raise PlaywrightTimeoutError("Timed out waiting for profile page to load")
+    if not routed:
+        await page.goto(cfg.profile_url, wait_until="domcontentloaded", timeout=cfg.navigation_timeout_ms)
 
+    def _is_on_profile() -> bool:
+        return page.url.startswith(base_profile_url)
 
-FIELD_MAPPINGS: Dict[str, str] = {
-    "Name of Organisation": "nameOfOrganisation",
-    "Name of Organisation*": "nameOfOrganisation",
-    "Date of Incorporation": "dateOfIncorporation",
-    "PAN": "pan",
-    "PAN Status": "panStatus",
-    "Residential Status": "residentialStatus",
-    "Type of Company": "typeOfCompany",
-    "Email": "email",
-    "Mobile": "mobile",
-    "Address": "address",
-}
+    if not await wait_until_event(page, "framenavigated", _is_on_profile, cfg.navigation_timeout_ms):
+        raise PlaywrightTimeoutError("Timed out waiting for profile page to load")
 
 
 async def extract_profile_data(page) -> Dict[str, Any]:
     """Extract key profile details from the profile screen."""
 
     await page.wait_for_load_state("domcontentloaded")
-    await page.wait_for_timeout(500)
+    await settle(profile_rows_ready(page, 500), 500)
 
     rows: List[Tuple[str, str]] = await page.evaluate(
         """
@@ -229,13 +446,11 @@ async def extract_profile_data(page) -> Dict[str, Any]:
     if not raw:
         raise RuntimeError("Unable to extract profile data from the page")
 
-    structured: Dict[str, Any] = {"raw": raw}
-    for original_key, mapped_key in FIELD_MAPPINGS.items():
-        if original_key in raw:
-            structured[mapped_key] = raw[original_key]
+    structured = map_profile_rows(raw)
 
     structured.setdefault("title", sanitize_input(await page.title()))
     structured.setdefault("url", page.url)
+    structured.setdefault("source", "dom")
 
     return structured
 
@@ -243,6 +458,240 @@ async def extract_profile_data(page) -> Dict[str, Any]:
 # Core Orchestration
 # =========================
 
+@asynccontextmanager
+async def _launched_context(
+    user_data_dir: Optional[str],
+    launch_kwargs: Dict[str, Any],
+    context_kwargs: Dict[str, Any],
+) -> AsyncIterator[BrowserContext]:
+    """Launch a dedicated browser (persistent when `user_data_dir` is given) for one fetch."""
+
+    async with async_playwright() as p:
+        chromium = p.chromium
+        context = None
+        browser = None
+
+        try:
+            # Persistent vs temporary session
+            if user_data_dir:
+                context = await chromium.launch_persistent_context(user_data_dir, **launch_kwargs)
+            else:
+                browser = await chromium.launch(**launch_kwargs)
+                context = await browser.new_context(**context_kwargs)
+
+            yield context
+
+        finally:
+            try:
+                if context:
+                    await context.close()
+            except Exception:
+                pass
+            try:
+                if browser:
+                    await browser.close()
+            except Exception:
+                pass
+
+
+async def _reset_portal_storage(context: BrowserContext, cfg: ScraperConfig) -> None:
+    """Drop the previous user's login from a reused profile while keeping its caches warm."""
+
+    await context.clear_cookies()
+    page = context.pages[0] if context.pages else await context.new_page()
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(cfg.login_url))
+    try:
+        session = await context.new_cdp_session(page)
+        await session.send(
+            "Storage.clearDataForOrigin",
+            {"origin": origin, "storageTypes": "cookies,local_storage,indexeddb,websql"},
+        )
+        await session.detach()
+    except Exception as e:
+        log.warning(f"Could not clear portal storage in reused profile: {e}")
+
+
+@asynccontextmanager
+async def _profile_context(
+    cfg: ScraperConfig,
+    storage_state: Optional[Dict[str, Any]] = None,
+    pool: Optional[BrowserPool] = None,
+) -> AsyncIterator[BrowserContext]:
+    """
+    Yield an isolated browser context for one profile fetch.
+    Uses the worker's browser pool when one is running. Otherwise a browser is
+    launched: on an explicit user_data_dir, on a leased clone of the warmed
+    profile template (PROFILE_ROOT_DIR), or as a temporary session.
+    """
+    profile = get_launch_profile(cfg.launch_profile)
+    context_kwargs: Dict[str, Any] = {}
+    if storage_state and not cfg.user_data_dir:
+        context_kwargs["storage_state"] = storage_state
+
+    pool = pool or get_browser_pool()
+    if pool is not None and not cfg.user_data_dir:
+        async with pool.context(**context_kwargs) as context:
+            yield context
+        return
+
+    launch_kwargs = {"headless": cfg.headless, "args": list(profile.args)}
+    if cfg.chrome_path and os.path.exists(cfg.chrome_path):
+        launch_kwargs["executable_path"] = cfg.chrome_path
+    context_kwargs.update(profile.context_options)
+
+    profile_dirs = None if cfg.user_data_dir else get_profile_dir_manager()
+    if profile_dirs is not None:
+        await profile_dirs.ensure_template(cfg.login_url, launch_kwargs)
+        async with profile_dirs.lease() as slot_dir:
+            async with _launched_context(slot_dir, {**launch_kwargs, **profile.context_options}, {}) as context:
+                await _reset_portal_storage(context, cfg)
+                if storage_state and storage_state.get("cookies"):
+                    await context.add_cookies(storage_state["cookies"])
+                yield context
+        return
+
+    if cfg.user_data_dir:
+        launch_kwargs.update(profile.context_options)
+    async with _launched_context(cfg.user_data_dir, launch_kwargs, context_kwargs) as context:
+        yield context
+
+
+class SessionExpiredError(RuntimeError):
+    """A cached portal session no longer authenticates; a fresh login is needed."""
+
+
+def _on_login_route(page) -> bool:
+    return "login" in page.url.split("#", 1)[-1].lower()
+
+
+async def _resumed_session_is_valid(
+    page,
+    cfg: ScraperConfig,
+    listener: Optional[ProfileResponseListener] = None,
+) -> bool:
+    """After opening the profile with a cached session, check the SPA did not bounce us to login."""
+
+    signals = [
+        page.wait_for_function(
+            "() => location.hash.toLowerCase().includes('login') || (%s)()" % PROFILE_ROWS_READY_JS.strip(),
+            timeout=cfg.action_timeout_ms,
+        )
+    ]
+    if listener:
+        signals.append(listener.wait())
+    if not await settle(first_ready(*signals), cfg.action_timeout_ms):
+        return False
+    return not _on_login_route(page)
+
+
+async def _run_profile_session(
+    context: BrowserContext,
+    cfg: ScraperConfig,
+    session: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+    phases: Optional[PhaseTracker] = None,
+) -> Dict[str, Any]:
+    """
+    Log in and extract the profile using an already opened context.
+    When a cached `session` was loaded into the context, go straight to the
+    profile; raises SessionExpiredError if the portal rejects it.
+    Per-fetch counters (blocked requests, ...) are written into `metrics`.
+    """
+    cache = get_session_cache() if cfg.reuse_session and not cfg.user_data_dir else None
+    phases = phases or PhaseTracker()
+
+    if session:
+        await restore_session_storage(context, session)
+
+    page = await context.new_page()
+    page.set_default_timeout(cfg.action_timeout_ms)
+
+    blocker: Optional[RequestBlocker] = None
+    if cfg.block_media:
+        blocker = RequestBlocker(cfg.block_resource_types)
+        try:
+            await blocker.attach(page)
+        except Exception as e:
+            log.warning(f"CDP request blocking unavailable, falling back to route handler: {e}")
+            blocker = None
+            await context.route(
+                re.compile(r".*\.(png|jpg|jpeg|gif|webp|svg|mp4|webm)(\?.*)?$", re.I),
+                lambda route: asyncio.create_task(route.abort()),
+            )
+
+    static_cache = get_static_cache()
+    static_counters = await static_cache.attach(context) if static_cache else None
+
+    async def do_login():
+        await phases.enter("login_user")
+        await page.goto(cfg.login_url, wait_until="domcontentloaded", timeout=cfg.navigation_timeout_ms)
+        await settle(login_form_ready(page, 400), 400)
+        await robust_fill_user_id_and_continue(page, cfg)
+        await phases.enter("login_password")
+        await settle(password_field_ready(page, 800), 800)
+        await robust_fill_password_and_submit(page, cfg)
+        await phases.enter("dashboard")
+        await settle(dashboard_reached(page, 800), 800)
+
+    listener: Optional[ProfileResponseListener] = None
+
+    async def goto_profile():
+        nonlocal listener
+        await phases.enter("profile_nav")
+        if cfg.profile_api_pattern:
+            if listener:
+                listener.close()
+            listener = ProfileResponseListener(page, cfg.profile_api_pattern)
+        await spa_safe_goto_profile(page, cfg)
+        signals = [profile_rows_ready(page, cfg.idle_wait_ms)]
+        if listener:
+            signals.append(listener.wait())
+        await settle(first_ready(*signals), cfg.idle_wait_ms)
+
+    try:
+        if session:
+            if cfg.profile_api_pattern:
+                listener = ProfileResponseListener(page, cfg.profile_api_pattern)
+            try:
+                await phases.enter("profile_nav")
+                await spa_safe_goto_profile(page, cfg)
+                resumed = await _resumed_session_is_valid(page, cfg, listener)
+            except PlaywrightTimeoutError:
+                resumed = False
+            if not resumed:
+                raise SessionExpiredError(f"Cached portal session for {cfg.user_id} expired")
+            log.info("Reusing cached portal session for %s", cfg.user_id)
+        else:
+            await retry_async(
+                do_login,
+                cfg.retries,
+                cfg.retry_backoff_base_ms,
+                lambda n, e: log.warning(f"Login retry {n}: {e}"),
+            )
+            await retry_async(goto_profile, 2, cfg.retry_backoff_base_ms)
+
+        if cache:
+            await cache.save(cfg.user_id, cfg.password, await capture_session(context, page))
+
+        await phases.enter("extracting")
+        profile = listener.result if listener else None
+        if profile is None:
+            return await extract_profile_data(page)
+
+        profile.setdefault("title", sanitize_input(await page.title()))
+        profile.setdefault("url", page.url)
+        return profile
+    finally:
+        if listener:
+            listener.close()
+        if blocker:
+            if metrics is not None:
+                metrics["network"] = blocker.stats()
+            await blocker.detach()
+        if static_counters is not None and metrics is not None:
+            metrics["static_cache"] = dict(static_counters)
+
+
 async def fetch_itr_profile(
     user_id: Optional[str] = None,
     password: Optional[str] = None,
@@ -251,17 +700,21 @@ async def fetch_itr_profile(
     chrome_path: Optional[str] = None,
     save_json_path: Optional[str] = None,
     verbosity: int = 1,
+    browser_pool: Optional[BrowserPool] = None,
+    on_phase: Optional[PhaseCallback] = None,
 ) -> Dict[str, Any]:
     """
     Logs in and fetches ITR profile details using Playwright automation.
     Returns structured dict data.
+    An explicit `browser_pool` always supplies the context (user_data_dir is ignored).
+    `on_phase` receives a PhaseTracker snapshot on every phase transition.
     """
     try:
         cfg = ScraperConfig(
             user_id=user_id or os.getenv("ITR_USER_ID", ""),
             password=password or os.getenv("ITR_PASSWORD", ""),
             headless=True if headless is None else bool(headless),
-            user_data_dir=user_data_dir or os.getenv("USER_DATA_DIR"),
+            user_data_dir=None if browser_pool else (user_data_dir or os.getenv("USER_DATA_DIR")),
             chrome_path=chrome_path or os.getenv("CHROME_PATH"),
             save_json_path=save_json_path,
         )
@@ -271,82 +724,111 @@ async def fetch_itr_profile(
 
         log.info(f"Starting ITR profile fetch (headless={cfg.headless})")
 
-        browser_args = ["--disable-dev-shm-usage", "--no-sandbox", "--disable-blink-features=AutomationControlled"]
-
-        async with async_playwright() as p:
-            chromium = p.chromium
-            context = None
-            browser = None
+        session = None
+        cache = get_session_cache() if cfg.reuse_session and not cfg.user_data_dir else None
+        if cache:
+            session = await cache.load(cfg.user_id, cfg.password)
 
+        profile = None
+        metrics: Dict[str, Any] = {}
+        phases = PhaseTracker(on_phase)
+        await phases.enter("launching")
+        if session:
             try:
-                launch_kwargs = {"headless": cfg.headless, "args": browser_args}
-                if cfg.chrome_path and os.path.exists(cfg.chrome_path):
-                    launch_kwargs["executable_path"] = cfg.chrome_path
-
-                # Persistent vs temporary session
-                if cfg.user_data_dir:
-                    context = await chromium.launch_persistent_context(cfg.user_data_dir, **launch_kwargs)
-                else:
-                    browser = await chromium.launch(**launch_kwargs)
-                    context = await browser.new_context()
-
-                if cfg.block_media:
-                    await context.route(
-                        re.compile(r".*\.(png|jpg|jpeg|gif|webp|svg|mp4|webm)(\?.*)?$", re.I),
-                        lambda route: asyncio.create_task(route.abort()),
-                    )
-
-                page = await context.new_page()
-                page.set_default_timeout(cfg.action_timeout_ms)
-
-                async def do_login():
-                    await page.goto(cfg.login_url, wait_until="domcontentloaded", timeout=cfg.navigation_timeout_ms)
-                    await page.wait_for_timeout(400)
-                    await robust_fill_user_id_and_continue(page, cfg)
-                    await page.wait_for_timeout(800)
-                    await robust_fill_password_and_submit(page, cfg)
-                    await page.wait_for_timeout(800)
-
-                await retry_async(
-                    do_login,
-                    cfg.retries,
-                    cfg.retry_backoff_base_ms,
-                    lambda n, e: log.warning(f"Login retry {n}: {e}"),
-                )
-
-                async def goto_profile():
-                    await spa_safe_goto_profile(page, cfg)
-                    await page.wait_for_timeout(cfg.idle_wait_ms)
-
-                await retry_async(goto_profile, 2, cfg.retry_backoff_base_ms)
-
-                profile = await extract_profile_data(page)
-                result: Dict[str, Any] = {"status": "SUCCESS", "data": profile}
-
-                if cfg.save_json_path:
-                    with open(cfg.save_json_path, "w", encoding="utf-8") as f:
-                        json.dump({"fetched_at": datetime.utcnow().isoformat() + "Z", "data": profile}, f, indent=2)
-                    log.info(f"Saved profile data to {cfg.save_json_path}")
-
-                return result
-
-            finally:
-                try:
-                    if context:
-                        await context.close()
-                except Exception:
-                    pass
-                try:
-                    if browser:
-                        await browser.close()
-                except Exception:
-                    pass
+                async with _profile_context(cfg, session.get("storage_state"), browser_pool) as context:
+                    profile = await _run_profile_session(context, cfg, session, metrics, phases)
+            except SessionExpiredError as e:
+                log.info(f"{e}; logging in")
+                await cache.invalidate(cfg.user_id)
+
+        if profile is None:
+            async with _profile_context(cfg, pool=browser_pool) as context:
+                profile = await _run_profile_session(context, cfg, metrics=metrics, phases=phases)
+
+        await phases.enter("done")
+        metrics["phases"] = phases.snapshot()["phases"]
+        result: Dict[str, Any] = {"status": "SUCCESS", "data": profile, "metrics": metrics}
+
+        if cfg.save_json_path:
+            with open(cfg.save_json_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": datetime.utcnow().isoformat() + "Z", "data": profile}, f, indent=2)
+            log.info(f"Saved profile data to {cfg.save_json_path}")
+
+        return result
 
     except Exception as e:
         log.exception(f"Profile fetch failed: {e}")
         return {"status": "FAILURE", "error": str(e)}
 
 
+# =========================
+# Batch Orchestration
+# =========================
+
+UserLock = Callable[[str], AsyncContextManager[None]]
+
+
+async def iter_itr_profiles_batch(
+    credentials: List[Dict[str, str]],
+    concurrency: Optional[int] = None,
+    user_lock: Optional[UserLock] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch many users over isolated contexts of one browser, yielding each
+    {"index", "userId", "status", ...} result as soon as that user finishes.
+    A failing user only yields its own FAILURE entry.
+    `user_lock(user_id)` is held around each user's fetch.
+    """
+    own_pool: Optional[BrowserPool] = None
+    pool = get_browser_pool()
+    if pool is None:
+        pool_config = BrowserPoolConfig.from_settings()
+        pool_config.size = 1
+        own_pool = BrowserPool(pool_config)
+        await own_pool.start()
+        pool = own_pool
+
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.BATCH_CONCURRENCY))
+
+    async def _one(index: int, item: Dict[str, str]) -> Dict[str, Any]:
+        user_id = item.get("userId", "")
+        try:
+            async with semaphore, (user_lock(user_id) if user_lock else nullcontext()):
+                result = await fetch_itr_profile(user_id, item.get("password", ""), browser_pool=pool)
+        except Exception as e:
+            log.warning(f"Skipping {user_id}: {e}")
+            result = {"status": "FAILURE", "error": str(e)}
+        return {"index": index, "userId": user_id, **result}
+
+    fetches = [asyncio.ensure_future(_one(index, item)) for index, item in enumerate(credentials)]
+    try:
+        for finished in asyncio.as_completed(fetches):
+            yield await finished
+    finally:
+        for fetch in fetches:
+            if not fetch.done():
+                fetch.cancel()
+        await asyncio.gather(*fetches, return_exceptions=True)
+        if own_pool is not None:
+            await own_pool.close()
+
+
+async def fetch_itr_profiles_batch(
+    credentials: List[Dict[str, str]],
+    concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    user_lock: Optional[UserLock] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch many users concurrently and return their results in input order."""
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(credentials)
+    async for item in iter_itr_profiles_batch(credentials, concurrency, user_lock):
+        results[item["index"]] = item
+        if on_result:
+            await on_result(item)
+    return results
+
+
 # =========================
 # CLI Utility (Optional)
 # =========================
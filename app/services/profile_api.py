@@ -0,0 +1,245 @@
+import re
+import asyncio
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.logger import get_logger
+from app.utils.helpers import sanitize_input
+
+log = get_logger("profile_api")
+
+# Profile service calls made by the portal SPA; override with PROFILE_API_PATTERN
+# (e.g. to point at a local stand-in server replaying recorded responses).
+DEFAULT_PROFILE_API_PATTERN = r"/iec/.*servicesapi/.*(profile|getentity)"
+
+# Profile table labels on the portal page -> output keys.
+FIELD_MAPPINGS: Dict[str, str] = {
+    "Name of Organisation": "nameOfOrganisation",
+    "Name of Organisation*": "nameOfOrganisation",
+    "Date of Incorporation": "dateOfIncorporation",
+    "PAN": "pan",
+    "PAN Status": "panStatus",
+    "Residential Status": "residentialStatus",
+    "Type of Company": "typeOfCompany",
+    "Email": "email",
+    "Mobile": "mobile",
+    "Address": "address",
+}
+
+# JSON leaf keys (lower-cased) -> the same output keys FIELD_MAPPINGS produces from the DOM.
+JSON_FIELD_MAPPINGS: Dict[str, str] = {
+    "orgname": "nameOfOrganisation",
+    "organisationname": "nameOfOrganisation",
+    "nameoforganisation": "nameOfOrganisation",
+    "dateofincorporation": "dateOfIncorporation",
+    "incorporationdate": "dateOfIncorporation",
+    "doi": "dateOfIncorporation",
+    "pan": "pan",
+    "panstatus": "panStatus",
+    "residentialstatus": "residentialStatus",
+    "resstatus": "residentialStatus",
+    "typeofcompany": "typeOfCompany",
+    "companytype": "typeOfCompany",
+    "email": "email",
+    "emailid": "email",
+    "primaryemail": "email",
+    "secondaryemail": "secondaryEmail",
+    "mobile": "mobile",
+    "mobileno": "mobile",
+    "primarymobile": "mobile",
+    "secondarymobile": "secondaryMobile",
+    "address": "address",
+}
+
+
+# Output key -> the portal's on-screen label, so "raw" has the same keys whether
+# the profile came from the DOM table or from the API response.
+PORTAL_LABELS: Dict[str, str] = {
+    "nameOfOrganisation": "Name of Organisation",
+    "dateOfIncorporation": "Date of Incorporation",
+    "pan": "PAN",
+    "panStatus": "PAN Status",
+    "residentialStatus": "Residential Status",
+    "typeOfCompany": "Type of Company",
+    "email": "Email",
+    "secondaryEmail": "Secondary Email",
+    "mobile": "Mobile",
+    "secondaryMobile": "Secondary Mobile",
+    "address": "Address",
+}
+
+# An API response only resolves the listener when it carries these; side calls
+# matching the URL pattern with just a PAN or an email must not stand in for
+# the profile.
+REQUIRED_FIELDS = ("pan", "nameOfOrganisation")
+
+# The profile table shows contacts as "Primary (<role>) <value> Secondary (<role>) <value>".
+_CONTACT_PAIR = re.compile(r"^Primary\s*\([^)]*\)\s*(.*?)\s*Secondary\s*\([^)]*\)\s*(.*)$", re.I)
+_EMPTY_VALUES = ("", "--")
+
+
+def _flatten(value: Any, prefix: str, out: Dict[str, str]) -> None:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(child, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            _flatten(child, f"{prefix}[{index}]", out)
+    elif value is not None and value != "":
+        out[prefix] = sanitize_input(str(value))
+
+
+def _join_address(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return sanitize_input(value)
+    if isinstance(value, dict):
+        parts = [sanitize_input(str(part)) for part in value.values() if isinstance(part, (str, int)) and str(part).strip()]
+        return ", ".join(parts) or None
+    return None
+
+
+def _split_contact(value: str) -> Tuple[Optional[str], Optional[str]]:
+    match = _CONTACT_PAIR.match(value)
+    primary, secondary = (match.group(1), match.group(2)) if match else (value, None)
+    return (
+        primary if primary not in _EMPTY_VALUES else None,
+        secondary if secondary not in _EMPTY_VALUES else None,
+    )
+
+
+def _canonical_mobile(value: str) -> str:
+    digits = re.sub(r"\D", "", value)
+    if len(digits) == 10:
+        digits = "91" + digits
+    return "+" + digits if digits else value
+
+
+def canonicalize_profile(structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Give DOM- and API-sourced profiles identical values: contacts become bare
+    primary/secondary values, mobiles +<country><number>, and "raw" carries
+    the canonical value under the canonical label of every mapped field.
+    """
+    for key, secondary_key in (("email", "secondaryEmail"), ("mobile", "secondaryMobile")):
+        value = structured.pop(key, None)
+        if not isinstance(value, str):
+            continue
+        primary, secondary = _split_contact(value)
+        if primary:
+            structured[key] = primary
+        if secondary:
+            structured.setdefault(secondary_key, secondary)
+    for key in ("mobile", "secondaryMobile"):
+        if key in structured:
+            structured[key] = _canonical_mobile(structured[key])
+
+    raw = structured.setdefault("raw", {})
+    for key, label in PORTAL_LABELS.items():
+        if key in structured:
+            raw[label] = structured[key]
+    return structured
+
+
+def map_profile_rows(rows: Dict[str, str]) -> Dict[str, Any]:
+    """Map the label -> value rows of the profile table (DOM path)."""
+
+    structured: Dict[str, Any] = {"raw": {label: value for label, value in rows.items() if label not in FIELD_MAPPINGS}}
+    for label, mapped_key in FIELD_MAPPINGS.items():
+        if label in rows:
+            structured[mapped_key] = rows[label]
+    return canonicalize_profile(structured)
+
+
+def map_profile_json(payload: Any) -> Dict[str, Any]:
+    """
+    Map a profile API response onto the extract_profile_data output shape.
+    Values are canonicalized exactly as on the DOM path, so a profile does not
+    depend on where it came from. Returns {} unless REQUIRED_FIELDS are present.
+    """
+    leaves: Dict[str, str] = {}
+    _flatten(payload, "", leaves)
+
+    structured: Dict[str, Any] = {}
+    for path, value in leaves.items():
+        leaf = re.sub(r"\[\d+\]$", "", path.rsplit(".", 1)[-1]).lower()
+        mapped_key = JSON_FIELD_MAPPINGS.get(leaf)
+        if mapped_key and mapped_key != "address":
+            structured.setdefault(mapped_key, value)
+
+    address = _find_key(payload, "address")
+    if address is not None:
+        joined = _join_address(address)
+        if joined:
+            structured["address"] = joined
+
+    if not all(structured.get(key) for key in REQUIRED_FIELDS):
+        return {}
+    canonicalize_profile(structured)
+    structured["source"] = "xhr"
+    return structured
+
+
+def _find_key(value: Any, wanted: str) -> Any:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if str(key).lower() == wanted:
+                return child
+            found = _find_key(child, wanted)
+            if found is not None:
+                return found
+    elif isinstance(value, list):
+        for child in value:
+            found = _find_key(child, wanted)
+            if found is not None:
+                return found
+    return None
+
+
+class ProfileResponseListener:
+    """
+    Capture the portal's profile JSON the moment the SPA receives it.
+    Attach before navigating to the profile; `result` stays None until a
+    matching XHR/fetch response mapped to at least one profile field.
+    """
+
+    def __init__(self, page, pattern: str):
+        self._page = page
+        self._pattern = re.compile(pattern, re.I)
+        self._future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._parsing: Set[asyncio.Task] = set()
+        page.on("response", self._on_response)
+
+    @property
+    def result(self) -> Optional[Dict[str, Any]]:
+        if self._future.done() and not self._future.cancelled():
+            return self._future.result()
+        return None
+
+    def _on_response(self, response) -> None:
+        if self._future.done() or not self._pattern.search(response.url):
+            return
+        if response.request.resource_type not in ("xhr", "fetch") or not response.ok:
+            return
+        task = asyncio.ensure_future(self._parse(response))
+        self._parsing.add(task)
+        task.add_done_callback(self._parsing.discard)
+
+    async def _parse(self, response) -> None:
+        try:
+            payload = await response.json()
+        except Exception as e:
+            log.debug("Ignoring non-JSON profile response %s: %s", response.url, e)
+            return
+        profile = map_profile_json(payload)
+        if profile and not self._future.done():
+            log.debug("Captured profile from %s", response.url)
+            self._future.set_result(profile)
+
+    async def wait(self) -> Dict[str, Any]:
+        return await asyncio.shield(self._future)
+
+    def close(self) -> None:
+        self._page.remove_listener("response", self._on_response)
+        for task in list(self._parsing):
+            task.cancel()
+        if not self._future.done():
+            self._future.cancel()
@@ -0,0 +1,56 @@
+import json
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import get_async_redis
+from app.services.single_flight import user_digest
+from app.utils.helpers import password_check, password_matches
+
+log = get_logger("profile_cache")
+
+PROFILE_KEY_PREFIX = "itr:profile:"
+
+
+def _profile_key(user_id: str) -> str:
+    return f"{PROFILE_KEY_PREFIX}{user_digest(user_id)}"
+
+
+async def store(user_id: str, password: str, profile: Dict[str, Any]) -> None:
+    """
+    Keep the latest successful profile of a user with its fetch time.
+    A salted hash of the password is stored alongside so the cached copy is
+    only ever served to callers presenting the same credentials.
+    """
+    if settings.PROFILE_CACHE_TTL_SECONDS <= 0:
+        return
+    check = await asyncio.to_thread(password_check, password)
+    entry = {"fetched_at": time.time(), **check, "data": profile}
+    try:
+        await get_async_redis().set(
+            _profile_key(user_id), json.dumps(entry, default=str), ex=settings.PROFILE_CACHE_TTL_SECONDS
+        )
+    except Exception as e:
+        log.warning("Could not store profile: %s", e)
+
+
+async def load(user_id: str, password: str) -> Optional[Dict[str, Any]]:
+    """{"fetched_at": epoch seconds, "data": profile}, or None when nothing usable is cached."""
+
+    try:
+        raw = await get_async_redis().get(_profile_key(user_id))
+    except Exception as e:
+        log.warning("Profile cache unavailable: %s", e)
+        return None
+    if not raw:
+        return None
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        log.warning("Discarding unreadable cached profile")
+        return None
+    if not await asyncio.to_thread(password_matches, password, entry):
+        return None
+    return {"fetched_at": entry["fetched_at"], "data": entry["data"]}
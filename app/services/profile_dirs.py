@@ -0,0 +1,200 @@
+import os
+import sys
+import time
+import shutil
+import asyncio
+import subprocess
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+log = get_logger("profile_dirs")
+
+# Chrome's single-instance markers; a clone must not inherit the template's.
+_LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+READY_MARKER = ".template-ready"
+BUILD_LOCK = ".template-building"
+BUILD_LOCK_STALE_SECONDS = 600
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _try_lock(path: str) -> Optional[int]:
+    """Non-blocking exclusive flock; the kernel drops it if the holder dies."""
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except OSError:
+        os.close(fd)
+        return None
+
+
+def _unlock(fd: int) -> None:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def clone_tree(src: str, dst: str) -> None:
+    """
+    Copy a profile directory as cheaply as the filesystem allows.
+    Uses copy-on-write reflinks (cp --reflink=auto) on Linux and a plain copy
+    elsewhere. Hardlinks are deliberately not used: Chrome rewrites cache and
+    database files in place, which would leak changes back into the template.
+    """
+    if sys.platform.startswith("linux") and shutil.which("cp"):
+        result = subprocess.run(["cp", "-a", "--reflink=auto", src, dst], capture_output=True)
+        if result.returncode == 0:
+            return
+        log.debug("cp --reflink failed (%s); falling back to copytree", result.stderr.strip())
+        shutil.rmtree(dst, ignore_errors=True)
+    shutil.copytree(src, dst, symlinks=True, ignore=shutil.ignore_patterns(*_LOCK_FILES))
+
+
+class ProfileDirManager:
+    """
+    Per-slot Chromium profile directories cloned from one warmed template.
+    The template is built once per node (caches and service workers primed by
+    loading the login page); each concurrent session leases its own slot so
+    launch_persistent_context never contends for Chrome's profile lock.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.template_dir = os.path.join(root, "template")
+        self._leased: Set[str] = set()
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def template_ready(self) -> bool:
+        return os.path.exists(os.path.join(self.template_dir, READY_MARKER))
+
+    def _acquire_build_lock(self) -> bool:
+        lock = os.path.join(self.root, BUILD_LOCK)
+        try:
+            os.mkdir(lock)
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > BUILD_LOCK_STALE_SECONDS:
+                    os.rmdir(lock)
+                    os.mkdir(lock)
+                    return True
+            except OSError:
+                pass
+            return False
+
+    def _release_build_lock(self) -> None:
+        try:
+            os.rmdir(os.path.join(self.root, BUILD_LOCK))
+        except OSError:
+            pass
+
+    async def ensure_template(self, warm_url: str, launch_kwargs: Dict[str, Any]) -> None:
+        """Build the warmed template once per node; other workers wait for it."""
+
+        while not self.template_ready:
+            if not self._acquire_build_lock():
+                await asyncio.sleep(1)
+                continue
+            try:
+                if not self.template_ready:
+                    await self._build_template(warm_url, launch_kwargs)
+            finally:
+                self._release_build_lock()
+
+    async def _build_template(self, warm_url: str, launch_kwargs: Dict[str, Any]) -> None:
+        from playwright.async_api import async_playwright
+
+        log.info("Building warmed Chromium profile template in %s", self.template_dir)
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+        async with async_playwright() as p:
+            context = await p.chromium.launch_persistent_context(self.template_dir, **launch_kwargs)
+            try:
+                page = context.pages[0] if context.pages else await context.new_page()
+                await page.goto(warm_url, wait_until="networkidle", timeout=120000)
+            finally:
+                await context.close()
+        with open(os.path.join(self.template_dir, READY_MARKER), "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+
+    def _prepare_slot(self, slot_dir: str) -> None:
+        if os.path.isdir(slot_dir) and dir_size(slot_dir) > self.max_bytes:
+            log.info("Profile %s exceeded %d MB; recloning", slot_dir, self.max_bytes // (1024 * 1024))
+            shutil.rmtree(slot_dir, ignore_errors=True)
+        if not os.path.isdir(slot_dir):
+            clone_tree(self.template_dir, slot_dir)
+        for name in _LOCK_FILES:
+            try:
+                os.remove(os.path.join(slot_dir, name))
+            except OSError:
+                pass
+
+    def _claim_slot(self) -> Tuple[str, Optional[int]]:
+        """
+        First slot free on this node. Slots are locked with flock, so every
+        worker daemon sharing PROFILE_ROOT_DIR sees the same leases; without
+        flock (Windows) slots are private to this process.
+        """
+        if fcntl is None:
+            prefix, index = f"p{os.getpid()}-", 0
+            while f"{prefix}{index}" in self._leased:
+                index += 1
+            return f"{prefix}{index}", None
+
+        index = 0
+        while True:
+            slot = str(index)
+            if slot not in self._leased:
+                fd = _try_lock(os.path.join(self.root, f"slot-{slot}.lock"))
+                if fd is not None:
+                    return slot, fd
+            index += 1
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[str]:
+        """Lease a profile directory no other session of this node is using."""
+
+        slot, fd = self._claim_slot()
+        self._leased.add(slot)
+        slot_dir = os.path.join(self.root, f"slot-{slot}")
+        try:
+            await asyncio.to_thread(self._prepare_slot, slot_dir)
+            yield slot_dir
+        finally:
+            self._leased.discard(slot)
+            if fd is not None:
+                _unlock(fd)
+
+
+_manager: Optional[ProfileDirManager] = None
+
+
+def get_profile_dir_manager() -> Optional[ProfileDirManager]:
+    """The node's profile directory manager, or None when PROFILE_ROOT_DIR is not set."""
+
+    global _manager
+    if _manager is None and settings.PROFILE_ROOT_DIR:
+        _manager = ProfileDirManager(settings.PROFILE_ROOT_DIR, settings.PROFILE_DIR_MAX_MB * 1024 * 1024)
+    return _manager
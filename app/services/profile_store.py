@@ -0,0 +1,416 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+log = get_logger("profile_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    pan TEXT,
+    user_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_pan_fetched ON profiles (pan, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_profiles_user_fetched ON profiles (user_id, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_profiles_fetched ON profiles (fetched_at);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    pan TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    field TEXT NOT NULL,
+    op TEXT NOT NULL,
+    old TEXT,
+    new TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_pan_seq ON changes (pan, seq);
+"""
+
+# Added to `profiles` after the first release: rows written before hold full
+# profiles, so they become snapshots numbered in fetch order.
+_VERSION_MIGRATION = (
+    "ALTER TABLE profiles ADD COLUMN version INTEGER",
+    "ALTER TABLE profiles ADD COLUMN kind TEXT NOT NULL DEFAULT 'snapshot'",
+    """UPDATE profiles SET version = (
+        SELECT n FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY pan ORDER BY fetched_at, id) AS n FROM profiles
+        ) AS numbered WHERE numbered.id = profiles.id
+    )""",
+)
+# Fetch metadata (see METADATA_FIELDS) is kept per row, outside the versioned data.
+_META_MIGRATION = "ALTER TABLE profiles ADD COLUMN meta TEXT"
+_VERSION_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_profiles_pan_version ON profiles (pan, version)"
+
+# Describe the fetch rather than the profile: a different page title or a DOM
+# instead of an XHR capture is not a change of the entity.
+METADATA_FIELDS = ("source", "title", "url")
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+_STOP = object()
+
+
+def profile_pan(profile: Dict[str, Any]) -> Optional[str]:
+    pan = profile.get("pan") or (profile.get("raw") or {}).get("PAN")
+    return pan.strip().upper() if isinstance(pan, str) and pan.strip() else None
+
+
+def split_metadata(profile: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(profile without METADATA_FIELDS, those fields)."""
+
+    content = {key: value for key, value in profile.items() if key not in METADATA_FIELDS}
+    meta = {key: profile[key] for key in METADATA_FIELDS if key in profile}
+    return content, meta
+
+
+# =========================
+# Deltas
+# =========================
+
+Path = Tuple[str, ...]
+
+
+def _flatten(value: Any, prefix: Path = ()) -> Dict[Path, Any]:
+    if isinstance(value, dict) and (value or not prefix):
+        leaves: Dict[Path, Any] = {}
+        for key, item in value.items():
+            leaves.update(_flatten(item, prefix + (str(key),)))
+        return leaves
+    return {prefix: value}
+
+
+def diff_profiles(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Leaf-level delta turning `old` into `new`:
+    {"set": [[path, value], ...], "unset": [path, ...]}, paths as key lists.
+    """
+    before, after = _flatten(old), _flatten(new)
+    return {
+        "set": [[list(path), value] for path, value in after.items() if path not in before or before[path] != value],
+        "unset": [list(path) for path in before if path not in after],
+    }
+
+
+def apply_delta(profile: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    leaves = _flatten(profile)
+    for path in delta.get("unset", []):
+        leaves.pop(tuple(path), None)
+    for path, value in delta.get("set", []):
+        leaves[tuple(path)] = value
+
+    rebuilt: Dict[str, Any] = {}
+    for path, value in leaves.items():
+        if not path:
+            continue
+        node = rebuilt
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return rebuilt
+
+
+def _change_rows(pan: str, version: int, fetched_at: float, old: Dict[str, Any], delta: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+    before = _flatten(old) if old else {}
+    rows = []
+    for path, value in delta["set"]:
+        op = "changed" if tuple(path) in before else "added"
+        old_value = json.dumps(before[tuple(path)], default=str) if op == "changed" else None
+        rows.append((pan, version, fetched_at, ".".join(path), op, old_value, json.dumps(value, default=str)))
+    for path in delta["unset"]:
+        rows.append((pan, version, fetched_at, ".".join(path), "removed", json.dumps(before[tuple(path)], default=str), None))
+    return rows
+
+
+def _change_to_dict(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    seq, pan, version, fetched_at, field, op, old, new = row
+    return {
+        "seq": seq,
+        "pan": pan,
+        "version": version,
+        "fetched_at": fetched_at,
+        "field": field,
+        "op": op,
+        "old": json.loads(old) if old is not None else None,
+        "new": json.loads(new) if new is not None else None,
+    }
+
+
+class ProfileStore:
+    """
+    Fetched profiles in a local SQLite database (WAL mode), indexed by PAN,
+    userId and fetch time. Writes are queued and committed in batches by one
+    writer thread per process; reads use per-thread connections and never wait
+    for the writer.
+
+    Each PAN's fetches are numbered versions. Only every `snapshot_every`-th
+    version stores the full profile; the others store the delta against the
+    previous version, and every changed field is appended to the `changes`
+    feed. METADATA_FIELDS are stored per row and never versioned.
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval_s: float = 1.0, snapshot_every: int = 10):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.snapshot_every = max(1, snapshot_every)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._migrate()
+        self._writer = threading.Thread(target=self._write_loop, name="profile-store-writer", daemon=True)
+        self._writer.start()
+
+    def _migrate(self) -> None:
+        """
+        Create or upgrade the schema. Every worker process and the API run this
+        on first use, so the column check happens again under the write lock.
+        """
+        conn = self._connect()
+        conn.isolation_level = None  # transactions are explicit below
+        try:
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(profiles)")}
+                if "version" not in columns:
+                    for statement in _VERSION_MIGRATION:
+                        conn.execute(statement)
+                if "meta" not in columns:
+                    conn.execute(_META_MIGRATION)
+                conn.execute(_VERSION_INDEX)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---- writes ----
+
+    def save(self, user_id: str, profile: Dict[str, Any], fetched_at: Optional[float] = None) -> None:
+        """Queue one fetched profile; returns immediately."""
+
+        row = (profile_pan(profile), user_id, fetched_at or time.time(), json.dumps(profile, default=str))
+        self._queue.put(row)
+
+    def _drain(self, first: Any) -> Tuple[List[Tuple[Any, ...]], bool]:
+        rows, stop = [], first is _STOP
+        if not stop:
+            rows.append(first)
+        deadline = time.monotonic() + self.flush_interval_s
+        while not stop and len(rows) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+            else:
+                rows.append(item)
+        return rows, stop
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        conn.isolation_level = None  # transactions are explicit below
+        stop = False
+        while not stop:
+            rows, stop = self._drain(self._queue.get())
+            if not rows:
+                continue
+            try:
+                # IMMEDIATE takes the write lock up front, so the previous
+                # version read below cannot change under another process.
+                conn.execute("BEGIN IMMEDIATE")
+                for row in rows:
+                    self._insert_version(conn, *row)
+                conn.execute("COMMIT")
+            except Exception as e:
+                # Any failure (a locked or corrupt database, a row that cannot be
+                # diffed, ...) costs this batch only; the writer must stay alive.
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                log.exception("Dropped %d profile(s): %s", len(rows), e)
+        conn.close()
+
+    def _insert_version(self, conn: sqlite3.Connection, pan: Optional[str], user_id: str, fetched_at: float, data: str) -> None:
+        profile, meta = split_metadata(json.loads(data))
+        previous = self._latest_version(conn, pan) if pan else None
+        version = previous[0] + 1 if previous else 1
+
+        # Rows written before the meta column carry metadata in their data; leave it out of the diff too.
+        old = split_metadata(self._reconstruct(conn, pan, previous[0]))[0] if previous else {}
+        delta = diff_profiles(old, profile)
+        if previous is None or (version - 1) % self.snapshot_every == 0:
+            kind, stored = SNAPSHOT, json.dumps(profile, default=str)
+        else:
+            kind, stored = DELTA, json.dumps(delta, default=str)
+
+        conn.execute(
+            "INSERT INTO profiles (pan, user_id, fetched_at, data, version, kind, meta) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (pan, user_id, fetched_at, stored, version if pan else None, kind, json.dumps(meta, default=str) if meta else None),
+        )
+        if pan:
+            conn.executemany(
+                "INSERT INTO changes (pan, version, fetched_at, field, op, old, new) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _change_rows(pan, version, fetched_at, old, delta),
+            )
+
+    # ---- version reconstruction ----
+
+    @staticmethod
+    def _latest_version(conn: sqlite3.Connection, pan: str) -> Optional[Tuple[int, float]]:
+        return conn.execute(
+            "SELECT version, fetched_at FROM profiles WHERE pan = ? ORDER BY version DESC LIMIT 1", (pan,)
+        ).fetchone()
+
+    @staticmethod
+    def _replay(conn: sqlite3.Connection, pan: str, first: int, last: int) -> Iterator[Tuple[int, str, float, Dict[str, Any]]]:
+        """Yield (version, user_id, fetched_at, full profile) for versions first..last, oldest first."""
+
+        snapshot = conn.execute(
+            "SELECT MAX(version) FROM profiles WHERE pan = ? AND version <= ? AND kind = ?", (pan, first, SNAPSHOT)
+        ).fetchone()[0]
+        if snapshot is None:
+            return
+        rows = conn.execute(
+            "SELECT version, user_id, fetched_at, kind, data, meta FROM profiles "
+            "WHERE pan = ? AND version BETWEEN ? AND ? ORDER BY version",
+            (pan, snapshot, last),
+        )
+        profile: Dict[str, Any] = {}
+        for version, user_id, fetched_at, kind, data, meta in rows:
+            profile = json.loads(data) if kind == SNAPSHOT else apply_delta(profile, json.loads(data))
+            if version >= first:
+                # A row's metadata replaces whatever an older snapshot carried in its data.
+                yield version, user_id, fetched_at, {**split_metadata(profile)[0], **json.loads(meta)} if meta else profile
+
+    def _reconstruct(self, conn: sqlite3.Connection, pan: str, version: int) -> Dict[str, Any]:
+        for _, _, _, profile in self._replay(conn, pan, version, version):
+            return profile
+        return {}
+
+    def close(self, timeout: float = 30) -> None:
+        """Commit everything queued so far and stop the writer."""
+
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+
+    # ---- reads ----
+
+    def latest(self, pan: str, as_of: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Most recent profile of a PAN, or the one current at `as_of` (epoch seconds)."""
+
+        pan = pan.strip().upper()
+        conn = self._reader()
+        row = conn.execute(
+            "SELECT version FROM profiles WHERE pan = ? AND fetched_at <= ? ORDER BY fetched_at DESC LIMIT 1",
+            (pan, as_of if as_of is not None else float("inf")),
+        ).fetchone()
+        if row is None:
+            return None
+        for version, user_id, fetched_at, profile in self._replay(conn, pan, row[0], row[0]):
+            return {"pan": pan, "version": version, "userId": user_id, "fetched_at": fetched_at, "data": profile}
+        return None
+
+    def history(self, pan: str, limit: int = 50, before: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Profiles of a PAN, newest first; page with `before` = last fetched_at seen."""
+
+        pan = pan.strip().upper()
+        conn = self._reader()
+        versions = [row[0] for row in conn.execute(
+            "SELECT version FROM profiles WHERE pan = ? AND fetched_at < ? ORDER BY fetched_at DESC LIMIT ?",
+            (pan, before if before is not None else float("inf"), limit),
+        )]
+        if not versions:
+            return []
+        wanted = set(versions)
+        profiles = [
+            {"pan": pan, "version": version, "userId": user_id, "fetched_at": fetched_at, "data": profile}
+            for version, user_id, fetched_at, profile in self._replay(conn, pan, min(versions), max(versions))
+            if version in wanted
+        ]
+        return profiles[::-1]
+
+    def changes(self, after: int = 0, limit: int = 500, pan: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Field-level change feed in commit order; pass the last `seq` seen as `after`."""
+
+        if pan:
+            rows = self._reader().execute(
+                "SELECT seq, pan, version, fetched_at, field, op, old, new FROM changes "
+                "WHERE pan = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (pan.strip().upper(), after, limit),
+            )
+        else:
+            rows = self._reader().execute(
+                "SELECT seq, pan, version, fetched_at, field, op, old, new FROM changes "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after, limit),
+            )
+        return [_change_to_dict(row) for row in rows]
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> Optional[ProfileStore]:
+    """
+    This process's profile store, or None when PROFILE_STORE_PATH is not set.
+    The first call opens and migrates the database; use open_profile_store()
+    from async code.
+    """
+
+    global _store
+    if _store is None and settings.PROFILE_STORE_PATH:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore(
+                    settings.PROFILE_STORE_PATH,
+                    settings.PROFILE_STORE_BATCH_SIZE,
+                    settings.PROFILE_STORE_FLUSH_SECONDS,
+                    settings.PROFILE_STORE_SNAPSHOT_EVERY,
+                )
+    return _store
+
+
+async def open_profile_store() -> Optional[ProfileStore]:
+    """get_profile_store() without blocking the event loop on the first open."""
+
+    if _store is not None or not settings.PROFILE_STORE_PATH:
+        return _store
+    return await asyncio.to_thread(get_profile_store)
+
+
+async def close_profile_store() -> None:
+    global _store
+    if _store is not None:
+        await asyncio.to_thread(_store.close)
+        _store = None
@@ -0,0 +1,165 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import get_async_redis
+
+log = get_logger("selector_stats")
+
+STATS_KEY_PREFIX = "itr:selector_stats:"
+STATS_INDEX_KEY = f"{STATS_KEY_PREFIX}index"
+
+# Below this many attempts a selector keeps its static position.
+MIN_ATTEMPTS_FOR_RANKING = 10
+# Warn when the best selector of a step matches less often than this.
+DRIFT_WARNING_RATE = 0.8
+
+
+# Halve a step's counters in one atomic step, and only while one of them is
+# still over the window (concurrent recorders must not decay twice).
+# hits/attempts stay integers so HINCRBY keeps working on them.
+_DECAY_SCRIPT = """
+local fields = redis.call('HGETALL', KEYS[1])
+local over = false
+for i = 1, #fields, 2 do
+    if string.sub(fields[i], 1, 9) == 'attempts|' and tonumber(fields[i + 1]) > tonumber(ARGV[1]) then
+        over = true
+        break
+    end
+end
+if not over then
+    return 0
+end
+for i = 1, #fields, 2 do
+    local halved = tonumber(fields[i + 1]) / 2
+    if string.sub(fields[i], 1, 11) == 'latency_ms|' then
+        redis.call('HSET', KEYS[1], fields[i], tostring(halved))
+    else
+        redis.call('HSET', KEYS[1], fields[i], math.floor(halved))
+    end
+end
+return 1
+"""
+
+
+def _stats_key(description: str) -> str:
+    return STATS_KEY_PREFIX + description.strip().lower().replace(" ", "_")
+
+
+def _decode(raw: Dict[bytes, bytes]) -> Dict[str, Dict[str, float]]:
+    stats: Dict[str, Dict[str, float]] = {}
+    for field, value in raw.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        metric, _, selector = field.partition("|")
+        stats.setdefault(selector, {"hits": 0.0, "attempts": 0.0, "latency_ms": 0.0})[metric] = float(value)
+    return stats
+
+
+def _success_rate(entry: Dict[str, float]) -> float:
+    # Laplace smoothing keeps new or rarely tried selectors from jumping to either end.
+    return (entry.get("hits", 0.0) + 1) / (entry.get("attempts", 0.0) + 2)
+
+
+class SelectorStats:
+    """
+    Hit/latency statistics for the fallback selector lists, shared through Redis.
+    Candidates are reordered by recent success rate; counters are halved once a
+    selector passes `window` attempts so old DOM layouts fade out.
+    """
+
+    def __init__(self, window: int, refresh_seconds: int):
+        self.window = window
+        self.refresh_seconds = refresh_seconds
+        self._cache: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._drift_warned: Dict[str, str] = {}
+
+    async def _load(self, description: str) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        if now - self._loaded_at.get(description, 0.0) < self.refresh_seconds:
+            return self._cache.get(description, {})
+        self._loaded_at[description] = now
+        try:
+            self._cache[description] = _decode(await get_async_redis().hgetall(_stats_key(description)))
+        except Exception as e:
+            log.debug("Selector stats unavailable: %s", e)
+        return self._cache.get(description, {})
+
+    async def order(self, description: str, selectors: List[str]) -> List[str]:
+        stats = await self._load(description)
+
+        def rank(item):
+            index, selector = item
+            entry = stats.get(selector, {})
+            if entry.get("attempts", 0.0) < MIN_ATTEMPTS_FOR_RANKING:
+                return (0, index)
+            return (-_success_rate(entry), index)
+
+        ordered = [selector for _, selector in sorted(enumerate(selectors), key=rank)]
+        self._check_drift(description, ordered[0], stats.get(ordered[0]))
+        return ordered
+
+    def _check_drift(self, description: str, best: str, entry: Optional[Dict[str, float]]) -> None:
+        if not entry or entry.get("attempts", 0.0) < MIN_ATTEMPTS_FOR_RANKING:
+            return
+        rate = entry.get("hits", 0.0) / entry["attempts"]
+        if rate < DRIFT_WARNING_RATE and self._drift_warned.get(description) != best:
+            self._drift_warned[description] = best
+            log.warning("Possible portal DOM drift: best %s selector %s matches only %.0f%%", description, best, rate * 100)
+
+    async def record(self, description: str, selectors: List[str], hits: Dict[str, float]) -> None:
+        """Count an attempt for every selector and a hit, with its latency in ms, for each one in `hits`."""
+
+        key = _stats_key(description)
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            pipe.sadd(STATS_INDEX_KEY, key)
+            for selector in selectors:
+                pipe.hincrby(key, f"attempts|{selector}", 1)
+            for selector, latency_ms in hits.items():
+                pipe.hincrby(key, f"hits|{selector}", 1)
+                pipe.hincrbyfloat(key, f"latency_ms|{selector}", latency_ms)
+            counts = await pipe.execute()
+            attempts = counts[1:1 + len(selectors)]
+            if any(int(count) > self.window for count in attempts):
+                await self._decay(key)
+        except Exception as e:
+            log.debug("Could not record selector stats: %s", e)
+
+    async def _decay(self, key: str) -> None:
+        await get_async_redis().eval(_DECAY_SCRIPT, 1, key, self.window)
+
+
+async def selector_metrics() -> Dict[str, Any]:
+    """All recorded selector stats, for the metrics endpoint."""
+
+    client = get_async_redis()
+    metrics: Dict[str, Any] = {}
+    for key in sorted(await client.smembers(STATS_INDEX_KEY)):
+        key = key.decode() if isinstance(key, bytes) else key
+        step = key[len(STATS_KEY_PREFIX):]
+        selectors = []
+        for selector, entry in _decode(await client.hgetall(key)).items():
+            attempts = entry.get("attempts", 0.0)
+            hits = entry.get("hits", 0.0)
+            selectors.append({
+                "selector": selector,
+                "attempts": attempts,
+                "hits": hits,
+                "success_rate": round(hits / attempts, 4) if attempts else None,
+                "avg_latency_ms": round(entry.get("latency_ms", 0.0) / hits, 1) if hits else None,
+            })
+        selectors.sort(key=lambda item: item["success_rate"] or 0, reverse=True)
+        metrics[step] = selectors
+    return metrics
+
+
+_stats: Optional[SelectorStats] = None
+
+
+def get_selector_stats() -> Optional[SelectorStats]:
+    global _stats
+    if _stats is None and settings.SELECTOR_STATS_ENABLED:
+        _stats = SelectorStats(settings.SELECTOR_STATS_WINDOW, settings.SELECTOR_STATS_REFRESH_SECONDS)
+    return _stats
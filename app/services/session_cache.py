@@ -0,0 +1,111 @@
+import json
+import asyncio
+import hashlib
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import get_async_redis
+from app.utils.helpers import password_check, password_matches
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # pragma: no cover - optional dependency
+    Fernet = None
+    InvalidToken = Exception
+
+log = get_logger("session_cache")
+
+SESSION_KEY_PREFIX = "itr:session:"
+
+
+def _cache_key(user_id: str) -> str:
+    digest = hashlib.sha256(user_id.strip().upper().encode("utf-8")).hexdigest()
+    return f"{SESSION_KEY_PREFIX}{digest}"
+
+
+class SessionCache:
+    """
+    Encrypted, TTL-bound store of portal sessions keyed by userId.
+    Each entry carries a salted password check, so a session is only resumed
+    by a caller that knows the password it was created with.
+    A session is the context `storage_state` (cookies + localStorage) plus the
+    page's sessionStorage, which the portal also uses for its auth token.
+    """
+
+    def __init__(self, secret: str, ttl_seconds: int):
+        self._fernet = Fernet(secret.encode("utf-8"))
+        self.ttl_seconds = ttl_seconds
+
+    async def load(self, user_id: str, password: str) -> Optional[Dict[str, Any]]:
+        """
+        The cached session of `user_id`, only if it was saved after a login
+        with this same password; otherwise None and the entry is left alone.
+        """
+        try:
+            token = await get_async_redis().get(_cache_key(user_id))
+        except Exception as e:
+            log.warning("Session cache unavailable: %s", e)
+            return None
+        if not token:
+            return None
+        try:
+            entry = json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError):
+            log.warning("Discarding unreadable cached session")
+            await self.invalidate(user_id)
+            return None
+        if not await asyncio.to_thread(password_matches, password, entry):
+            return None
+        return entry.get("session")
+
+    async def save(self, user_id: str, password: str, session: Dict[str, Any]) -> None:
+        check = await asyncio.to_thread(password_check, password)
+        token = self._fernet.encrypt(json.dumps({**check, "session": session}).encode("utf-8"))
+        try:
+            await get_async_redis().set(_cache_key(user_id), token, ex=self.ttl_seconds)
+        except Exception as e:
+            log.warning("Could not store session: %s", e)
+
+    async def invalidate(self, user_id: str) -> None:
+        try:
+            await get_async_redis().delete(_cache_key(user_id))
+        except Exception as e:
+            log.warning("Could not invalidate session: %s", e)
+
+
+_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> Optional[SessionCache]:
+    """Return the session cache, or None when no key is configured or cryptography is missing."""
+
+    global _cache
+    if _cache is None and settings.SESSION_CACHE_KEY and Fernet is not None:
+        _cache = SessionCache(settings.SESSION_CACHE_KEY, settings.SESSION_CACHE_TTL_SECONDS)
+    return _cache
+
+
+async def capture_session(context, page) -> Dict[str, Any]:
+    """Snapshot everything needed to resume the logged-in session in a new context."""
+
+    storage_state = await context.storage_state()
+    session_storage = await page.evaluate("() => ({origin: location.origin, items: {...sessionStorage}})")
+    return {"storage_state": storage_state, "session_storage": session_storage}
+
+
+async def restore_session_storage(context, session: Dict[str, Any]) -> None:
+    """Seed sessionStorage before any portal script runs; cookies come from storage_state."""
+
+    session_storage = session.get("session_storage") or {}
+    if not session_storage.get("items"):
+        return
+    script = """
+        ((data) => {
+            if (location.origin !== data.origin) return;
+            for (const [key, value] of Object.entries(data.items)) {
+                if (sessionStorage.getItem(key) === null) sessionStorage.setItem(key, value);
+            }
+        })(%s);
+    """ % json.dumps(session_storage)
+    await context.add_init_script(script)
@@ -0,0 +1,115 @@
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from redis.exceptions import LockError
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import get_async_redis
+
+log = get_logger("single_flight")
+
+INFLIGHT_KEY_PREFIX = "itr:inflight:"
+LOGIN_LOCK_PREFIX = "itr:login-lock:"
+
+# The registration is a hash {task_id, salt, check}: the in-flight task plus a
+# password check, so only callers with the same credentials are handed its id.
+# Plain string keys left by older releases are dropped on the next claim.
+_CLAIM_SCRIPT = """
+local kind = redis.call('type', KEYS[1])['ok']
+if kind == 'hash' then
+    return redis.call('hmget', KEYS[1], 'task_id', 'salt', 'check')
+elseif kind ~= 'none' then
+    redis.call('del', KEYS[1])
+end
+redis.call('hset', KEYS[1], 'task_id', ARGV[1], 'salt', ARGV[2], 'check', ARGV[3])
+redis.call('expire', KEYS[1], ARGV[4])
+return false
+"""
+# Only touch the key while it still names the caller's task.
+_REPLACE_SCRIPT = """
+if redis.call('type', KEYS[1])['ok'] == 'hash' and redis.call('hget', KEYS[1], 'task_id') == ARGV[1] then
+    redis.call('hset', KEYS[1], 'task_id', ARGV[2], 'salt', ARGV[3], 'check', ARGV[4])
+    redis.call('expire', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('type', KEYS[1])['ok'] == 'hash' and redis.call('hget', KEYS[1], 'task_id') == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LoginLockTimeout(RuntimeError):
+    """Another worker stayed logged in as the same user for longer than LOGIN_LOCK_WAIT_SECONDS."""
+
+
+def user_digest(user_id: str) -> str:
+    return hashlib.sha256(user_id.strip().upper().encode("utf-8")).hexdigest()
+
+
+def _inflight_key(user_id: str) -> str:
+    return f"{INFLIGHT_KEY_PREFIX}{user_digest(user_id)}"
+
+
+async def claim(user_id: str, task_id: str, check: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Register `task_id` as the one fetch in flight for `user_id`, with the
+    caller's password_check(). Returns None when claimed, else the existing
+    registration {"task_id", "salt", "check"}.
+    """
+    existing = await get_async_redis().eval(
+        _CLAIM_SCRIPT, 1, _inflight_key(user_id),
+        task_id, check["salt"], check["check"], settings.SINGLE_FLIGHT_TTL_SECONDS,
+    )
+    if not existing:
+        return None
+    return {name: (value or b"").decode() for name, value in zip(("task_id", "salt", "check"), existing)}
+
+
+async def replace(user_id: str, old_task_id: str, new_task_id: str, check: Dict[str, str]) -> bool:
+    """Hand the registration from a task that finished without releasing it to a new one."""
+
+    result = await get_async_redis().eval(
+        _REPLACE_SCRIPT, 1, _inflight_key(user_id),
+        old_task_id, new_task_id, check["salt"], check["check"], settings.SINGLE_FLIGHT_TTL_SECONDS,
+    )
+    return bool(result)
+
+
+async def release(user_id: str, task_id: str) -> None:
+    """Clear the registration, unless another task has taken it over since."""
+
+    try:
+        await get_async_redis().eval(_RELEASE_SCRIPT, 1, _inflight_key(user_id), task_id)
+    except Exception as e:
+        log.warning("Could not release in-flight registration: %s", e)
+
+
+@asynccontextmanager
+async def login_lock(user_id: str) -> AsyncIterator[None]:
+    """
+    Cluster-wide lock held while logged in as `user_id`, so two workers never
+    hold portal sessions for the same user (the portal kicks the older one).
+    The lock expires on its own if the worker dies mid-fetch.
+    """
+    lock = get_async_redis().lock(
+        f"{LOGIN_LOCK_PREFIX}{user_digest(user_id)}",
+        timeout=settings.LOGIN_LOCK_TIMEOUT_SECONDS,
+        blocking_timeout=settings.LOGIN_LOCK_WAIT_SECONDS,
+    )
+    if not await lock.acquire():
+        raise LoginLockTimeout(
+            f"Another session for this user is still running after {settings.LOGIN_LOCK_WAIT_SECONDS}s"
+        )
+    try:
+        yield
+    finally:
+        try:
+            await lock.release()
+        except LockError:
+            log.warning("Login lock expired before the fetch finished")
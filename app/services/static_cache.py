@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+log = get_logger("static_cache")
+
+# Bundles whose file name carries a build hash (main.3f2a9c1b7e.js) never change
+# under the same URL; everything else is revalidated after `revalidate_seconds`.
+HASHED_ASSET = re.compile(r"[.-][0-9a-f]{8,}\.(js|css)(\?|$)", re.I)
+
+# Response headers that describe the wire encoding rather than the stored body.
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class StaticAssetCache:
+    """
+    On-disk cache of the portal's JS/CSS bundles shared by every worker on a node.
+    Bodies are stored once per content hash under blobs/, and index/ maps each URL
+    to its blob plus validators. Index file mtimes double as LRU timestamps.
+    """
+
+    def __init__(self, root: str, max_bytes: int, revalidate_seconds: int, url_pattern: str):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.url_pattern = re.compile(url_pattern, re.I)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(self._blob_dir(), exist_ok=True)
+        os.makedirs(self._index_dir(), exist_ok=True)
+
+    def _blob_dir(self) -> str:
+        return os.path.join(self.root, "blobs")
+
+    def _index_dir(self) -> str:
+        return os.path.join(self.root, "index")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir(), digest[:2], digest)
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self._index_dir(), _sha256(url.encode("utf-8")) + ".json")
+
+    # ---- storage (blocking; called through asyncio.to_thread) ----
+
+    def _load(self, url: str) -> Optional[tuple]:
+        index_path = self._index_path(url)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(self._blob_path(entry["blob"]), "rb") as f:
+                body = f.read()
+            os.utime(index_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry, body
+
+    def _store(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        digest = _sha256(body)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            _atomic_write(blob_path, body)
+        entry = {
+            "url": url,
+            "blob": digest,
+            "size": len(body),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _HOP_HEADERS},
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "validated_at": time.time(),
+        }
+        _atomic_write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+        self._evict()
+
+    def _touch_validated(self, url: str, entry: Dict[str, Any]) -> None:
+        entry["validated_at"] = time.time()
+        _atomic_write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _evict(self) -> None:
+        """Drop least recently used URLs until referenced blobs fit in max_bytes."""
+
+        entries = []
+        for name in os.listdir(self._index_dir()):
+            path = os.path.join(self._index_dir(), name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                entries.append((os.path.getmtime(path), path, entry))
+            except (OSError, ValueError):
+                continue
+        entries.sort(key=lambda item: item[0])
+
+        referenced: Dict[str, int] = {}
+        for _, _, entry in entries:
+            referenced[entry["blob"]] = entry["size"]
+        total = sum(referenced.values())
+
+        while entries and total > self.max_bytes:
+            _, path, entry = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if not any(other["blob"] == entry["blob"] for _, _, other in entries):
+                total -= referenced.pop(entry["blob"], 0)
+                try:
+                    os.remove(self._blob_path(entry["blob"]))
+                except OSError:
+                    pass
+
+    # ---- request handling ----
+
+    def _is_fresh(self, url: str, entry: Dict[str, Any]) -> bool:
+        if HASHED_ASSET.search(url):
+            return True
+        return time.time() - entry.get("validated_at", 0) < self.revalidate_seconds
+
+    async def handle(self, route, counters: Dict[str, int]) -> None:
+        request = route.request
+        if request.method != "GET":
+            await route.fallback()
+            return
+
+        url = request.url
+        cached = await asyncio.to_thread(self._load, url)
+        if cached:
+            entry, body = cached
+            if self._is_fresh(url, entry):
+                self._count(counters, "hits")
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+
+            conditional = dict(request.headers)
+            if entry.get("etag"):
+                conditional["if-none-match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["if-modified-since"] = entry["last_modified"]
+            response = await route.fetch(headers=conditional)
+            if response.status == 304:
+                self._count(counters, "revalidated")
+                await asyncio.to_thread(self._touch_validated, url, entry)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+        else:
+            response = await route.fetch()
+
+        self._count(counters, "misses")
+        body = await response.body()
+        if response.ok:
+            try:
+                await asyncio.to_thread(self._store, url, response.status, response.headers, body)
+            except OSError as e:
+                log.warning("Could not cache %s: %s", url, e)
+        await route.fulfill(response=response, body=body)
+
+    def _count(self, counters: Dict[str, int], name: str) -> None:
+        setattr(self, name, getattr(self, name) + 1)
+        counters[name] = counters.get(name, 0) + 1
+
+    async def attach(self, context) -> Dict[str, int]:
+        """Serve matching assets of `context` from the cache; returns its live hit/miss counters."""
+
+        counters: Dict[str, int] = {"hits": 0, "misses": 0, "revalidated": 0}
+
+        async def _handler(route):
+            try:
+                await self.handle(route, counters)
+            except Exception as e:
+                log.debug("Static cache bypassed for %s: %s", route.request.url, e)
+                try:
+                    await route.fallback()
+                except Exception:
+                    pass
+
+        await context.route(self.url_pattern, _handler)
+        return counters
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+
+
+_cache: Optional[StaticAssetCache] = None
+
+
+def get_static_cache() -> Optional[StaticAssetCache]:
+    """The node-wide static asset cache, or None when STATIC_CACHE_DIR is not set."""
+
+    global _cache
+    if _cache is None and settings.STATIC_CACHE_DIR:
+        _cache = StaticAssetCache(
+            settings.STATIC_CACHE_DIR,
+            settings.STATIC_CACHE_MAX_MB * 1024 * 1024,
+            settings.STATIC_CACHE_REVALIDATE_SECONDS,
+            settings.STATIC_CACHE_URL_PATTERN,
+        )
+    return _cache
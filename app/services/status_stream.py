@@ -0,0 +1,120 @@
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+
+from celery import states
+from kombu.utils.encoding import bytes_to_str
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+from app.services import batch_tracker
+from app.services.profile_store import ProfileStore
+from app.services.task_status import format_progress, format_result, lookup_many
+
+KEEPALIVE_SECONDS = 15.0
+
+
+def sse(event: str, data: Dict[str, Any], event_id: Optional[Any] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _subscribe(channel: str):
+    pubsub = get_async_redis().pubsub()
+    await pubsub.subscribe(channel)
+    return pubsub
+
+
+async def _close(pubsub, channel: str) -> None:
+    try:
+        await pubsub.unsubscribe(channel)
+    finally:
+        await pubsub.aclose()
+
+
+async def task_events(task_id: str) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one task's state transitions.
+    The Redis result backend publishes every stored state on the task's meta
+    key, so subscribing there needs no polling; the stream ends at a ready state.
+    """
+    backend = celery_app.backend
+    channel = bytes_to_str(backend.get_key_for_task(task_id))
+    pubsub = await _subscribe(channel)
+    try:
+        # Snapshot after subscribing so no transition can slip between the two.
+        current = (await lookup_many([task_id]))[task_id]
+        yield sse("status", {"task_id": task_id, **current})
+        if current["status"] in states.READY_STATES:
+            return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            meta = backend.decode_result(message["data"])
+            state = meta.get("status", states.PENDING)
+            yield sse("status", {
+                "task_id": task_id,
+                "status": state,
+                "result": format_result(state, meta.get("result")),
+                "progress": format_progress(state, meta.get("result")),
+            })
+            if state in states.READY_STATES:
+                return
+    finally:
+        await _close(pubsub, channel)
+
+
+async def batch_events(batch_id: str) -> AsyncIterator[str]:
+    """Server-Sent Events for a bulk submission: one event per finished user, until all are done."""
+
+    channel = batch_tracker.events_channel(batch_id)
+    pubsub = await _subscribe(channel)
+    try:
+        snapshot = await batch_tracker.get_batch_status(batch_id, limit=0)
+        if not snapshot:
+            yield sse("error", {"batch_id": batch_id, "message": "Unknown or expired batch id"})
+            return
+        yield sse("progress", {"batch_id": batch_id, "counts": snapshot["counts"]})
+        if snapshot["done"]:
+            return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            event = json.loads(message["data"])
+            yield sse("result", {"batch_id": batch_id, **event})
+            counts = event["counts"]
+            if counts["succeeded"] + counts["failed"] >= snapshot["total"]:
+                yield sse("done", {"batch_id": batch_id, "counts": counts})
+                return
+    finally:
+        await _close(pubsub, channel)
+
+
+async def change_events(store: ProfileStore, after: int = 0, pan: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for the profile change feed, one per changed field.
+    Workers write the SQLite store directly, so new rows are found by polling
+    the feed's seq index; each event's id is its seq, which EventSource sends
+    back as Last-Event-ID on reconnect.
+    """
+    idle_since = time.monotonic()
+    while True:
+        changes = await asyncio.to_thread(store.changes, after, 500, pan)
+        for change in changes:
+            yield sse("change", change, event_id=change["seq"])
+            after = change["seq"]
+        if changes:
+            idle_since = time.monotonic()
+            continue
+        if time.monotonic() - idle_since >= KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            idle_since = time.monotonic()
+        await asyncio.sleep(settings.PROFILE_FEED_POLL_SECONDS)
@@ -0,0 +1,150 @@
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from celery import states
+
+from app.core import async_celery
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+
+MAX_IDS_PER_LOOKUP = 1000
+
+
+def format_result(state: str, result: Any) -> Optional[Any]:
+    """Client-facing payload for a task result, as served by /status."""
+
+    if state == states.SUCCESS:
+        return result
+    if state == states.FAILURE:
+        return {"status": "error", "message": str(result)}
+    if state == states.RETRY:
+        return {"status": "retry", "message": str(result)}
+    return None
+
+
+def format_progress(state: str, meta: Any) -> Optional[Dict[str, Any]]:
+    """Progress meta of a running task (current phase and per-phase timings, or batch counts)."""
+
+    # task_track_started alone stores {"pid", "hostname"}, which is not progress.
+    if state == states.STARTED and isinstance(meta, dict) and ("phase" in meta or "completed" in meta):
+        return meta
+    return None
+
+
+def status_etag(status: Dict[str, Any]) -> str:
+    body = json.dumps(status, sort_keys=True, default=str).encode()
+    return 'W/"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def _result_ttl_seconds() -> float:
+    expires = celery_app.conf.result_expires
+    if isinstance(expires, timedelta):
+        return expires.total_seconds()
+    return float(expires or 0)
+
+
+def _backend_expiry(meta: Dict[str, Any]) -> float:
+    """Epoch time at which the backend drops this result: date_done + result_expires."""
+
+    ttl = _result_ttl_seconds()
+    done = meta.get("date_done")
+    if isinstance(done, str):
+        try:
+            done = datetime.fromisoformat(done)
+        except ValueError:
+            done = None
+    if isinstance(done, datetime):
+        if done.tzinfo is None:
+            done = done.replace(tzinfo=timezone.utc)
+        return done.timestamp() + ttl
+    return time.time() + ttl
+
+
+class TerminalStatusCache:
+    """
+    Size-bounded LRU of finished task statuses for this API process.
+    SUCCESS/FAILURE/REVOKED results never change, so they are served from memory
+    until the backend itself would expire them.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], str]]" = OrderedDict()
+
+    def get(self, task_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        expires_at, status, etag = entry
+        if expires_at <= time.time():
+            del self._entries[task_id]
+            return None
+        self._entries.move_to_end(task_id)
+        return status, etag
+
+    def put(self, task_id: str, status: Dict[str, Any], etag: str, expires_at: float) -> None:
+        if self.max_entries <= 0 or expires_at <= time.time():
+            return
+        self._entries[task_id] = (expires_at, status, etag)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+terminal_cache = TerminalStatusCache(settings.STATUS_CACHE_SIZE)
+
+
+def _status_from_meta(task_id: str, meta: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+    if meta is None:
+        status = {"status": states.PENDING, "result": None, "progress": None}
+        return status, status_etag(status)
+
+    state = meta.get("status", states.PENDING)
+    status = {
+        "status": state,
+        "result": format_result(state, meta.get("result")),
+        "progress": format_progress(state, meta.get("result")),
+    }
+    etag = status_etag(status)
+    if state in states.READY_STATES:
+        terminal_cache.put(task_id, status, etag, _backend_expiry(meta))
+    return status, etag
+
+
+async def get_status(task_id: str) -> Tuple[Dict[str, Any], str]:
+    """Status of one task and its ETag; finished tasks are answered from the in-process cache."""
+
+    cached = terminal_cache.get(task_id)
+    if cached is not None:
+        return cached
+    return _status_from_meta(task_id, await async_celery.get_meta(task_id))
+
+
+async def lookup_many(task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Status and result of many tasks with a single MGET against the Redis
+    result backend; finished tasks already in the in-process cache are not
+    read again. Unknown ids report PENDING, like AsyncResult does.
+    """
+    statuses: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for task_id in task_ids:
+        cached = terminal_cache.get(task_id)
+        if cached is not None:
+            statuses[task_id] = cached[0]
+        else:
+            missing.append(task_id)
+
+    backend = celery_app.backend
+    keys = [backend.get_key_for_task(task_id) for task_id in missing]
+    values = await get_async_redis().mget(keys) if keys else []
+
+    for task_id, raw in zip(missing, values):
+        meta = backend.decode_result(raw) if raw is not None else None
+        statuses[task_id] = _status_from_meta(task_id, meta)[0]
+    return {task_id: statuses[task_id] for task_id in task_ids}
@@ -1,22 +1,68 @@
 import asyncio
+from typing import Any, Dict, List, Optional
+
+from celery import states
+from celery.exceptions import Retry
+
 from app.core.celery_app import celery_app
-from app.services.itr_service import fetch_itr_profile
+from app.core.config import settings
+from app.core.worker_loop import worker_loop
+from app.services import batch_tracker, profile_cache, single_flight
+from app.services.profile_store import open_profile_store
+from app.services.itr_service import fetch_itr_profile, fetch_itr_profiles_batch
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+def _run_timeout(task) -> Optional[float]:
+    """
+    How long a task may block on the worker loop: its hard time limit.
+    The threads pool of WORKER_MODE=asyncio does not enforce time limits, so
+    worker_loop.run cancels the coroutine itself when this expires.
+    """
+    limit = task.time_limit or celery_app.conf.task_time_limit
+    return float(limit) if limit else None
+
+
+async def _remember_profile(user_id: str, password: str, profile: Dict[str, Any]) -> None:
+    """Keep a successful fetch beyond result_expires: Redis for /process max-age, SQLite for history."""
+
+    await profile_cache.store(user_id, password, profile)
+    store = await open_profile_store()
+    if store is not None:
+        store.save(user_id, profile)
+
+
 @celery_app.task(name="app.tasks.profile_tasks.fetch_itr_profile_task", bind=True, max_retries=3)
 def fetch_itr_profile_task(self, user_id: str, password: str):
     """
     Background Celery task to fetch ITR profile details asynchronously.
     Safely runs async Playwright logic inside a sync Celery worker.
+    Holds the user's login lock while fetching and clears its single-flight
+    registration once it will not be retried any more.
     """
-    loop = asyncio.new_event_loop()
+    retrying = False
+    # self.request is thread-local; capture the id before work moves to other threads.
+    task_id = self.request.id
     try:
         logger.info(f"[task] Starting ITR profile fetch for user: {user_id}")
 
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(fetch_itr_profile(user_id, password))
+        async def _report_phase(progress: Dict[str, Any]) -> None:
+            # Stored as STARTED meta; the Redis backend also publishes it to the task's channel.
+            await asyncio.to_thread(self.update_state, task_id=task_id, state=states.STARTED, meta=progress)
+
+        async def _fetch() -> Dict[str, Any]:
+            async with single_flight.login_lock(user_id):
+                fetched = await fetch_itr_profile(user_id, password, on_phase=_report_phase)
+            if fetched.get("status") == "SUCCESS":
+                # Storage is best effort: retrying would mean logging in again for a fetch that worked.
+                try:
+                    await _remember_profile(user_id, password, fetched["data"])
+                except Exception as e:
+                    logger.warning(f"[task] Could not store profile of {user_id}: {e}")
+            return fetched
+
+        result = worker_loop.run(_fetch(), timeout=_run_timeout(self))
 
         logger.info(f"[task] Completed ITR profile fetch for user: {user_id}")
         return {"status": "success", "data": result}
@@ -29,10 +75,64 @@ def fetch_itr_profile_task(self, user_id: str, password: str):
 
         try:
             raise self.retry(exc=e)
+        except Retry:
+            retrying = True
+            raise
         except self.MaxRetriesExceededError:
             logger.critical(f"[task] Max retries exceeded for user: {user_id}")
 
         return {"status": "error", "message": str(e)}
+
     finally:
-        asyncio.set_event_loop(None)
-        loop.close()
+        if not retrying:
+            worker_loop.run(single_flight.release(user_id, task_id))
+
+
+@celery_app.task(
+    name="app.tasks.profile_tasks.fetch_itr_profiles_batch_task",
+    bind=True,
+    time_limit=settings.BATCH_TASK_TIME_LIMIT,
+)
+def fetch_itr_profiles_batch_task(self, credentials: List[Dict[str, str]], batch_id: Optional[str] = None, offset: int = 0):
+    """
+    Fetch many users in one task over one browser with bounded concurrency.
+    Progress counts are published to the task meta as each user finishes;
+    one user's failure never fails the batch. When part of a bulk submission
+    (`batch_id`), results also go to the batch tracker at `offset + index`.
+    """
+    total = len(credentials)
+    counts = {"succeeded": 0, "failed": 0}
+    # self.request is thread-local; capture the id before work moves to other threads.
+    task_id = self.request.id
+    logger.info(f"[task] Starting batch ITR profile fetch for {total} users")
+
+    async def _progress(item: Dict[str, Any]) -> None:
+        counts["succeeded" if item.get("status") == "SUCCESS" else "failed"] += 1
+        # Side effects are best effort per user: an error here must not cancel the rest of the chunk.
+        if item.get("status") == "SUCCESS":
+            try:
+                await _remember_profile(item["userId"], credentials[item["index"]]["password"], item["data"])
+            except Exception as e:
+                logger.warning(f"[task] Could not store profile of {item['userId']}: {e}")
+        if batch_id:
+            try:
+                await batch_tracker.record_result(batch_id, {**item, "index": offset + item["index"]})
+            except Exception as e:
+                logger.error(f"[task] Could not record result {offset + item['index']} of batch {batch_id}: {e}")
+        meta = {"total": total, "completed": counts["succeeded"] + counts["failed"], **counts}
+        # update_state does blocking Redis I/O; keep it off the shared worker loop.
+        # A lost progress write must never abort the rest of the batch.
+        try:
+            await asyncio.to_thread(self.update_state, task_id=task_id, state=states.STARTED, meta=meta)
+        except Exception as e:
+            logger.warning(f"[task] Could not publish batch progress: {e}")
+
+    async def _run() -> List[Dict[str, Any]]:
+        if batch_id:
+            await batch_tracker.mark_chunk_started(batch_id, total)
+        return await fetch_itr_profiles_batch(credentials, on_result=_progress, user_lock=single_flight.login_lock)
+
+    results = worker_loop.run(_run(), timeout=_run_timeout(self))
+
+    logger.info(f"[task] Completed batch: {counts['succeeded']} succeeded, {counts['failed']} failed")
+    return {"status": "success", "total": total, **counts, "results": results}
@@ -0,0 +1,63 @@
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+
+from app.core.celery_app import ASYNC_WORKER_CONCURRENCY, WORKER_MODE
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import close_async_redis
+from app.core.worker_loop import worker_loop
+from app.services.browser_pool import start_browser_pool, stop_browser_pool
+from app.services.profile_store import close_profile_store, get_profile_store
+
+logger = get_logger(__name__)
+
+
+def _is_prefork(worker) -> bool:
+    pool_cls = getattr(worker, "pool_cls", None)
+    return "prefork" in getattr(pool_cls, "__module__", str(pool_cls))
+
+
+def start_worker_runtime() -> None:
+    """Start the process-wide event loop and the resources that live on it."""
+
+    if WORKER_MODE == "asyncio":
+        worker_loop.set_max_concurrency(ASYNC_WORKER_CONCURRENCY)
+    worker_loop.start()
+    worker_loop.add_shutdown_hook(close_async_redis)
+    worker_loop.add_shutdown_hook(close_profile_store)
+    worker_loop.add_shutdown_hook(stop_browser_pool)
+
+    # Open (and migrate) the profile store now rather than inside the first task.
+    try:
+        get_profile_store()
+    except Exception as e:
+        logger.error(f"[worker] Profile store failed to open, retrying on first use: {e}")
+
+    if not settings.BROWSER_POOL_ENABLED:
+        return
+    try:
+        worker_loop.run(start_browser_pool())
+    except Exception as e:
+        logger.error(f"[worker] Browser pool failed to start, tasks will launch their own browser: {e}")
+
+
+@worker_process_init.connect
+def _start_prefork_child(**_):
+    start_worker_runtime()
+
+
+@worker_process_shutdown.connect
+def _stop_prefork_child(**_):
+    worker_loop.stop()
+
+
+@worker_init.connect
+def _start_single_process_worker(sender=None, **_):
+    # threads/solo pools never fork, so the main process owns the loop.
+    if not _is_prefork(sender):
+        start_worker_runtime()
+
+
+@worker_shutdown.connect
+def _stop_single_process_worker(sender=None, **_):
+    if not _is_prefork(sender):
+        worker_loop.stop()
@@ -1,7 +1,36 @@
-from typing import Optional
+import os
+import hmac
+import hashlib
+from typing import Any, Dict, Optional
+
+PBKDF2_ITERATIONS = 100_000
 
 
 def sanitize_input(text: Optional[str]) -> str:
     if text is None:
         return ""
     return " ".join(text.strip().splitlines())
+
+
+def _pbkdf2(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS)
+
+
+def password_check(password: str) -> Dict[str, str]:
+    """
+    Salted PBKDF2 digest of a password, stored next to per-user cached data so
+    it is only handed to callers presenting the same password. CPU-bound
+    (~tens of ms): call through asyncio.to_thread from async code.
+    """
+    salt = os.urandom(16)
+    return {"salt": salt.hex(), "check": _pbkdf2(password, salt).hex()}
+
+
+def password_matches(password: str, entry: Dict[str, Any]) -> bool:
+    """True when `entry` carries a password_check() of exactly this password."""
+
+    try:
+        salt, expected = bytes.fromhex(entry["salt"]), bytes.fromhex(entry["check"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return hmac.compare_digest(_pbkdf2(password, salt), expected)
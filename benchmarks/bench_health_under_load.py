@@ -0,0 +1,89 @@
+"""
+Measure /health latency on an idle API and while POST /process is being hammered.
+
+    python -m benchmarks.bench_health_under_load --base-url http://localhost:8000 --concurrency 50
+
+Needs httpx, a running API and its broker. Start that API with a queue no
+worker consumes, so the enqueued fetches never log in to the portal:
+
+    PROCESS_QUEUE=itr-bench uvicorn app.main:app
+    celery -A app.core.celery_app purge -Q itr-bench -f    # afterwards
+
+A handler that blocks the event loop while publishing shows up as p99 /health
+latency growing with --concurrency.
+"""
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def sample_health(client: httpx.AsyncClient, duration_s: float, interval_s: float) -> List[float]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval_s)
+    return latencies
+
+
+async def hammer_process(client: httpx.AsyncClient, path: str, stop: asyncio.Event, counter: List[int]) -> None:
+    while not stop.is_set():
+        # A fresh userId per request: single-flight would fold repeats of one id into a single task.
+        await client.post(path, json={"userId": f"BENCH-{uuid.uuid4().hex}", "password": "bench"})
+        counter[0] += 1
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        baseline = await sample_health(client, args.duration, args.interval)
+
+        stop = asyncio.Event()
+        counter = [0]
+        workers = [
+            asyncio.create_task(hammer_process(client, args.process_path, stop, counter))
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        loaded = await sample_health(client, args.duration, args.interval)
+        stop.set()
+        await asyncio.gather(*workers, return_exceptions=True)
+        rate = counter[0] / (time.perf_counter() - started)
+
+    print(f"{'':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, samples in (("idle", baseline), ("loaded", loaded)):
+        print(
+            f"{label:<10} {statistics.median(samples):>8.1f} "
+            f"{percentile(samples, 99):>8.1f} {max(samples):>8.1f}"
+        )
+    print(f"POST {args.process_path}: {rate:.0f} req/s with {args.concurrency} concurrent clients")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark /health latency under enqueue load.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--process-path", default="/api/itr/process")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.02)
+    args = parser.parse_args(argv or sys.argv[1:])
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
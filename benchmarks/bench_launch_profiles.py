@@ -0,0 +1,125 @@
+"""
+Compare Chromium launch profiles by peak RSS, CPU seconds and wall time per fetch.
+
+    python -m benchmarks.bench_launch_profiles --runs 5
+    python -m benchmarks.bench_launch_profiles --mode fetch --runs 3   # needs ITR_USER_ID / ITR_PASSWORD
+
+"page" mode launches a browser and loads the login page until the user id input
+is visible; "fetch" mode runs the full fetch_itr_profile flow.
+Figures cover every process spawned by this one (Playwright driver + Chromium).
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from typing import Dict, List
+
+import psutil
+from playwright.async_api import async_playwright
+
+from app.services.browser_pool import LAUNCH_PROFILES, get_launch_profile
+from app.services.itr_service import DEFAULT_LOGIN_URL, USER_ID_SELECTORS, fetch_itr_profile
+
+
+class ResourceSampler:
+    """Samples RSS and CPU time of all descendant processes in a background thread."""
+
+    def __init__(self, interval_s: float = 0.05):
+        self.interval_s = interval_s
+        self.peak_rss = 0
+        self._cpu_by_pid: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        rss = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                with child.oneshot():
+                    rss += child.memory_info().rss
+                    times = child.cpu_times()
+                    self._cpu_by_pid[child.pid] = times.user + times.system
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval_s)
+
+    def __enter__(self) -> "ResourceSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def cpu_seconds(self) -> float:
+        return sum(self._cpu_by_pid.values())
+
+
+async def _page_run(profile_name: str, login_url: str) -> None:
+    profile = get_launch_profile(profile_name)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=list(profile.args))
+        try:
+            context = await browser.new_context(**profile.context_options)
+            page = await context.new_page()
+            await page.goto(login_url, wait_until="domcontentloaded", timeout=60000)
+            await page.wait_for_selector(", ".join(USER_ID_SELECTORS), state="visible", timeout=60000)
+        finally:
+            await browser.close()
+
+
+async def _fetch_run(profile_name: str) -> None:
+    os.environ["BROWSER_LAUNCH_PROFILE"] = profile_name
+    result = await fetch_itr_profile()
+    if result.get("status") != "SUCCESS":
+        raise RuntimeError(result.get("error", "fetch failed"))
+
+
+def measure(profile_name: str, mode: str, login_url: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    with ResourceSampler() as sampler:
+        if mode == "fetch":
+            asyncio.run(_fetch_run(profile_name))
+        else:
+            asyncio.run(_page_run(profile_name, login_url))
+    return {
+        "peak_rss_mb": sampler.peak_rss / (1024 * 1024),
+        "cpu_s": sampler.cpu_seconds,
+        "wall_s": time.perf_counter() - started,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Chromium launch profiles.")
+    parser.add_argument("--profiles", default=",".join(LAUNCH_PROFILES))
+    parser.add_argument("--mode", choices=("page", "fetch"), default="page")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--login-url", default=os.getenv("LOGIN_URL") or DEFAULT_LOGIN_URL)
+    args = parser.parse_args(argv or sys.argv[1:])
+
+    # Workers in the fetch path must launch their own browser for a fair comparison.
+    os.environ.setdefault("BROWSER_POOL_ENABLED", "false")
+
+    print(f"{'profile':<10} {'peak RSS MB':>12} {'CPU s':>8} {'wall s':>8}   (median of {args.runs} runs, mode={args.mode})")
+    for name in [item.strip() for item in args.profiles.split(",") if item.strip()]:
+        samples = [measure(name, args.mode, args.login_url) for _ in range(args.runs)]
+        print(
+            f"{name:<10} "
+            f"{statistics.median(s['peak_rss_mb'] for s in samples):>12.0f} "
+            f"{statistics.median(s['cpu_s'] for s in samples):>8.2f} "
+            f"{statistics.median(s['wall_s'] for s in samples):>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Replay a recorded profile API response through the XHR capture path.
+
+    python -m benchmarks.replay_profile_api                 # map_profile_json only
+    python -m benchmarks.replay_profile_api --browser       # via a local stand-in server + Chromium
+
+The fixture holds the response body, the URL the SPA requested it from, the
+same profile as rows of the portal's DOM table and the profile both must map to
+(apart from "source", so a fetch never flips values between the two paths). "--browser" serves that body from a local HTTP server
+to a page that fetch()es it, and checks what ProfileResponseListener captures,
+so the real listener runs without touching the portal.
+Exits non-zero when the mapped profile differs from the expected one.
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from app.services.profile_api import DEFAULT_PROFILE_API_PATTERN, ProfileResponseListener, map_profile_json, map_profile_rows
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "profile_api_response.json")
+
+PAGE = """<!doctype html><html><body><script>
+fetch(%s, {headers: {"Accept": "application/json"}});
+</script></body></html>"""
+
+
+def _handler(fixture: Dict[str, Any]):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == fixture["url"]:
+                body, content_type = json.dumps(fixture["response"]).encode(), "application/json"
+            else:
+                body, content_type = (PAGE % json.dumps(fixture["url"])).encode(), "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+async def capture_in_browser(fixture: Dict[str, Any], pattern: str) -> Dict[str, Any]:
+    from playwright.async_api import async_playwright
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(fixture))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                listener = ProfileResponseListener(page, pattern)
+                try:
+                    await page.goto(f"http://127.0.0.1:{server.server_port}/")
+                    return await asyncio.wait_for(listener.wait(), 15)
+                finally:
+                    listener.close()
+            finally:
+                await browser.close()
+    finally:
+        server.shutdown()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded profile API response.")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--browser", action="store_true")
+    parser.add_argument("--pattern", default=os.getenv("PROFILE_API_PATTERN") or DEFAULT_PROFILE_API_PATTERN)
+    args = parser.parse_args(argv or sys.argv[1:])
+
+    with open(args.fixture, encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    if args.browser:
+        profile = asyncio.run(capture_in_browser(fixture, args.pattern))
+    else:
+        profile = map_profile_json(fixture["response"])
+
+    expected = fixture["expected"]
+    results = [("xhr", profile, expected)]
+    if "dom_rows" in fixture:
+        results.append(("dom", map_profile_rows(fixture["dom_rows"]), {**expected, "source": None}))
+
+    failed = False
+    for label, mapped, wanted in results:
+        for key in sorted(set(mapped) | set(wanted)):
+            if mapped.get(key) != wanted.get(key):
+                print(f"{label} {key}: expected {wanted.get(key)!r}, got {mapped.get(key)!r}")
+                failed = True
+    if failed:
+        return 1
+    print(f"OK: {len(expected)} fields match ({'browser' if args.browser else 'mapping'}, {len(results)} sources)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())